@@ -0,0 +1,30 @@
+"""
+Command line entry point.
+
+Usage:
+    python -m newsrss [serve]            Start the server
+    python -m newsrss publish [options]  Publish the playlists to a directory
+"""
+
+import sys
+
+
+def main(argv: list[str]) -> int:
+    command = argv[0] if argv else "serve"
+    if command == "publish":
+        from .publish import main as publish
+
+        status: int = publish(argv[1:])
+        return status
+    if command == "serve":
+        from .main import run
+
+        run()
+        return 0
+
+    print(__doc__.strip(), file=sys.stderr)
+    return 2
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
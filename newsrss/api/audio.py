@@ -0,0 +1,42 @@
+import logging
+
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import FileResponse, RedirectResponse, Response
+
+from ..core.dependencies import audio_cache_dependency, rss_service_dependency
+from ..services.audio_cache import AudioCacheService
+from ..services.rss import RSSService
+
+router = APIRouter()
+logger = logging.getLogger("newsrss")
+
+
+@router.api_route("/audio/{feed_id}/{guid:path}", methods=["GET", "HEAD"])
+async def get_audio(
+    feed_id: int,
+    guid: str,
+    audio_cache: AudioCacheService | None = audio_cache_dependency,
+    rss_service: RSSService = rss_service_dependency,
+) -> Response:
+    """
+    Serve a cached episode enclosure from the local disk.
+
+    Range requests, conditional requests and HEAD are handled by FileResponse,
+    which also hands the file to the server for zero-copy sending when the
+    ASGI server supports the ``http.response.pathsend`` extension.
+    Episodes that are not (or no longer) cached are redirected to the origin.
+    """
+    cached = None
+    if audio_cache is not None:
+        cached = audio_cache.get(feed_id, guid)
+
+    if cached is not None:
+        return FileResponse(cached.path, media_type=cached.media_type)
+
+    # Fall back to the origin URL if the episode is still known
+    for episode in rss_service.episodes_cache.get(feed_id, []):
+        if AudioCacheService.episode_id(episode) == guid:
+            logger.debug(f"Audio cache miss for feed {feed_id}, redirecting")
+            return RedirectResponse(str(episode.url), status_code=307)
+
+    raise HTTPException(status_code=404, detail="Episode not found")
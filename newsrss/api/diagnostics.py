@@ -0,0 +1,53 @@
+import asyncio
+from typing import Annotated, Any
+
+from fastapi import APIRouter, Query
+
+from ..core.dependencies import (
+    config_dependency,
+    loop_monitor_dependency,
+    rss_feeds_dependency,
+    rss_service_dependency,
+)
+from ..models.schemas import RSSFeed
+from ..services.diagnostics import LoopLagMonitor, feed_cache_report, process_memory
+from ..services.rss import RSSService
+
+router = APIRouter()
+
+
+@router.get("/diagnostics")
+async def diagnostics(
+    deep: Annotated[
+        bool,
+        Query(description="Measure the whole cache recursively (debug mode only)"),
+    ] = False,
+    feeds: list[RSSFeed] = rss_feeds_dependency,
+    rss_service: RSSService = rss_service_dependency,
+    loop_monitor: LoopLagMonitor = loop_monitor_dependency,
+    config: Any = config_dependency,
+) -> dict[str, Any]:
+    """
+    Report the content and memory usage of the episode cache, per feed, with
+    the process memory and the event loop lag.
+    """
+    deep = deep and config.is_debug()
+    if deep:
+        # Walking the whole cache is slow: keep it off the event loop
+        feed_reports = await asyncio.to_thread(
+            lambda: [feed_cache_report(rss_service, feed, True) for feed in feeds]
+        )
+    else:
+        feed_reports = [feed_cache_report(rss_service, feed) for feed in feeds]
+
+    return {
+        "process": process_memory(),
+        "event_loop_lag": loop_monitor.summary(),
+        "cache": {
+            "feeds": len(feed_reports),
+            "episodes": sum(report["episodes"] for report in feed_reports),
+            "approx_bytes": sum(report["approx_bytes"] for report in feed_reports),
+            "deep": deep,
+        },
+        "feeds": feed_reports,
+    }
@@ -0,0 +1,38 @@
+from typing import Any
+
+from fastapi import APIRouter, HTTPException
+
+from ..core.dependencies import episode_index_dependency, rss_feeds_dependency
+from ..models.schemas import RSSFeed
+from ..services.episode_index import EpisodeIndex
+
+router = APIRouter()
+
+
+@router.get("/episodes/{guid:path}")
+async def get_episode(
+    guid: str,
+    feed_id: int | None = None,
+    episode_index: EpisodeIndex = episode_index_dependency,
+    feeds: list[RSSFeed] = rss_feeds_dependency,
+) -> dict[str, Any]:
+    """
+    Return a cached episode by GUID (or enclosure URL), with every feed that
+    lists it.
+
+    Short GUIDs are only unique within a feed, so they are looked up in the
+    feed given by ``feed_id``.
+    """
+    episodes = episode_index.lookup(guid, feed_id)
+    if not episodes:
+        raise HTTPException(status_code=404, detail="Episode not found")
+
+    feed_names = {feed.id: feed.name for feed in feeds}
+    return {
+        "status": "success",
+        "guid": guid,
+        "episodes": [
+            {"feed_name": feed_names.get(feed_id), **episode.model_dump(mode="json")}
+            for feed_id, episode in episodes.items()
+        ],
+    }
@@ -0,0 +1,44 @@
+from typing import Any
+
+from fastapi import APIRouter
+from fastapi.responses import JSONResponse
+
+from ..core.dependencies import (
+    config_dependency,
+    rss_feeds_dependency,
+    rss_service_dependency,
+)
+from ..models.schemas import RSSFeed
+from ..services.rss import RSSService
+
+router = APIRouter()
+
+HTTP_STATUS_OK = 200
+HTTP_STATUS_SERVICE_UNAVAILABLE = 503
+
+
+@router.get("/healthz")
+async def healthz() -> dict[str, str]:
+    """Liveness probe: answers without any I/O."""
+    return {"status": "ok"}
+
+
+@router.get("/readyz")
+async def readyz(
+    feeds: list[RSSFeed] = rss_feeds_dependency,
+    rss_service: RSSService = rss_service_dependency,
+    config: Any = config_dependency,
+) -> JSONResponse:
+    """Readiness probe: ready once enough feeds have cached episodes."""
+    ratio = rss_service.cached_feeds_ratio(feeds)
+    required = config.get_readiness_ratio()
+    ready = ratio >= required
+
+    return JSONResponse(
+        status_code=HTTP_STATUS_OK if ready else HTTP_STATUS_SERVICE_UNAVAILABLE,
+        content={
+            "status": "ready" if ready else "warming up",
+            "cached_feeds_ratio": round(ratio, 3),
+            "required_ratio": required,
+        },
+    )
@@ -0,0 +1,67 @@
+from datetime import datetime, timedelta
+from typing import Annotated, Any
+
+from fastapi import APIRouter, HTTPException, Query
+
+from ..core.dependencies import history_dependency
+from ..services.history import EpisodeHistoryService
+
+router = APIRouter()
+
+MAX_HISTORY_LIMIT = 1000
+
+
+def _require_history(
+    history: EpisodeHistoryService | None,
+) -> EpisodeHistoryService:
+    """Return the history archive, or raise 404 if it is disabled."""
+    if history is None:
+        raise HTTPException(status_code=404, detail="Episode history is disabled")
+    return history
+
+
+@router.get("/history")
+async def get_history(
+    since: Annotated[
+        datetime | None,
+        Query(description="Only episodes published at or after this time"),
+    ] = None,
+    until: Annotated[
+        datetime | None, Query(description="Only episodes published before this time")
+    ] = None,
+    feed_id: Annotated[
+        list[int] | None, Query(description="Restrict to these feeds")
+    ] = None,
+    limit: Annotated[int, Query(ge=1, le=MAX_HISTORY_LIMIT)] = 100,
+    history: EpisodeHistoryService | None = history_dependency,
+) -> dict[str, Any]:
+    """
+    Return archived episodes published in a time range, most recent first.
+
+    Times without a timezone are interpreted as UTC.
+    """
+    episodes = await _require_history(history).query(since, until, feed_id, limit)
+    return {"status": "success", "count": len(episodes), "episodes": episodes}
+
+
+@router.get("/history/bulletins")
+async def get_bulletins(
+    at: Annotated[
+        datetime, Query(description="Reference time, e.g. 2024-05-01T08:00:00+02:00")
+    ],
+    window_minutes: Annotated[int, Query(ge=1, le=24 * 60)] = 30,
+    feed_id: Annotated[
+        list[int] | None, Query(description="Restrict to these feeds")
+    ] = None,
+    history: EpisodeHistoryService | None = history_dependency,
+) -> dict[str, Any]:
+    """
+    Return, for each feed, the episode published closest to a given time.
+
+    For example, the 8 o'clock bulletin from every feed yesterday.
+    Times without a timezone are interpreted as UTC.
+    """
+    episodes = await _require_history(history).nearest(
+        at, timedelta(minutes=window_minutes), feed_id
+    )
+    return {"status": "success", "count": len(episodes), "episodes": episodes}
@@ -0,0 +1,70 @@
+import logging
+
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import PlainTextResponse, Response
+
+from ..core.dependencies import audio_cache_dependency, hls_service_dependency
+from ..models.schemas import CachedAudio
+from ..services.audio_cache import AudioCacheService
+from ..services.hls import HlsService
+from ..services.playlist import PlaylistService
+
+router = APIRouter()
+logger = logging.getLogger("newsrss")
+
+HLS_PLAYLIST_MEDIA_TYPE = "application/vnd.apple.mpegurl"
+
+
+def _get_cached_mp3(
+    feed_id: int,
+    key: str,
+    audio_cache: AudioCacheService | None,
+    hls_service: HlsService | None,
+) -> tuple[CachedAudio, HlsService]:
+    """Return the cached file to segment, or raise 404 if HLS is not available."""
+    if audio_cache is None or hls_service is None:
+        raise HTTPException(status_code=404, detail="HLS is disabled")
+
+    cached = audio_cache.get_by_key(feed_id, key)
+    if cached is None or not hls_service.supports(cached):
+        raise HTTPException(status_code=404, detail="Episode not available as HLS")
+    return cached, hls_service
+
+
+@router.get("/hls/{feed_id}/{key}/index.m3u8")
+async def get_hls_playlist(
+    feed_id: int,
+    key: str,
+    audio_cache: AudioCacheService | None = audio_cache_dependency,
+    hls_service: HlsService | None = hls_service_dependency,
+) -> Response:
+    """Return the HLS media playlist of a cached episode."""
+    cached, hls_service = _get_cached_mp3(feed_id, key, audio_cache, hls_service)
+    part = await hls_service.playlist_part(cached, uri_prefix="")
+    return PlainTextResponse(
+        content=PlaylistService.generate_hls_media_playlist([part]),
+        media_type=HLS_PLAYLIST_MEDIA_TYPE,
+    )
+
+
+@router.get("/hls/{feed_id}/{key}/{index}.mp3")
+async def get_hls_segment(
+    feed_id: int,
+    key: str,
+    index: int,
+    audio_cache: AudioCacheService | None = audio_cache_dependency,
+    hls_service: HlsService | None = hls_service_dependency,
+) -> Response:
+    """Return a segment of a cached episode, read by byte offset from disk."""
+    cached, hls_service = _get_cached_mp3(feed_id, key, audio_cache, hls_service)
+    segments = await hls_service.get_segments(cached)
+    if not 0 <= index < len(segments):
+        raise HTTPException(status_code=404, detail="Segment not found")
+
+    content = await hls_service.read_segment(cached, segments[index])
+    return Response(
+        content=content,
+        media_type="audio/mpeg",
+        # Segments of a cached file never change
+        headers={"Cache-Control": "public, max-age=86400, immutable"},
+    )
@@ -4,7 +4,6 @@ from typing import Any, TypeVar
 
 from fastapi import APIRouter, Query, Request
 from fastapi.responses import HTMLResponse
-from fastapi.templating import Jinja2Templates
 
 from ..core.dependencies import (
     config_dependency,
@@ -27,7 +26,7 @@ async def home(
     request: Request,
     feeds: list[RSSFeed] = rss_feeds_dependency,
     rss_service: RSSService = rss_service_dependency,
-    templates: Jinja2Templates = templates_dependency,
+    templates: Any = templates_dependency,
     config: Any = config_dependency,
 ) -> HTMLResponse:
     """Main endpoint that displays the HTML page with statistics."""
@@ -76,6 +75,8 @@ async def home(
             "last_duration": stats.last_duration if stats else 0.0,
             "last_episode": stats.last_episode_title if stats else None,
             "success": stats.success if stats else False,
+            "error_message": stats.error_message if stats else None,
+            **rss_service.get_scrape_summary(feed.id),
         }
 
         # Add supplementary information about the episode if available
@@ -95,9 +96,10 @@ async def home(
 
         feeds_stats.append(feed_data)
 
-    return templates.TemplateResponse(
-        "index.html", {"request": request, "feeds": feeds_stats}
+    response: HTMLResponse = templates.TemplateResponse(
+        request, "index.html", {"feeds": feeds_stats}
     )
+    return response
 
 
 @router.get("/refresh")
@@ -120,7 +122,8 @@ async def refresh(
 
     # Create tasks for each feed to scrape
     tasks = [
-        asyncio.create_task(rss_service.fetch_feed(feed)) for feed in feeds_to_scrape
+        asyncio.create_task(rss_service.fetch_feed(feed, force=True))
+        for feed in feeds_to_scrape
     ]
 
     # Wait for completion with timeout
@@ -158,6 +161,8 @@ async def refresh(
             "last_duration": stats.last_duration if stats else 0.0,
             "last_episode": stats.last_episode_title if stats else None,
             "success": stats.success if stats else False,
+            "error_message": stats.error_message if stats else None,
+            **rss_service.get_scrape_summary(feed.id),
         }
 
         # Add supplementary information about the episode if available
@@ -1,17 +1,25 @@
 import asyncio
 import logging
+import time
 from collections.abc import Callable
 from typing import Any, TypeVar
 
-from fastapi import APIRouter
+from fastapi import APIRouter, Request
 from fastapi.responses import JSONResponse, PlainTextResponse, Response
 
 from ..core.dependencies import (
+    audio_cache_dependency,
     config_dependency,
+    episode_index_dependency,
+    hls_service_dependency,
     rss_feeds_dependency,
     rss_service_dependency,
 )
-from ..models.schemas import RSSFeed
+from ..models.schemas import Episode, RSSFeed
+from ..services.audio_cache import AudioCacheService
+from ..services.episode_index import EpisodeIndex
+from ..services.hls import HlsService
+from ..services.playlist import PlaylistService
 from ..services.rss import RSSService
 
 router = APIRouter()
@@ -22,8 +30,49 @@ T = TypeVar("T")
 DecoratedCallable = Callable[..., T]
 
 
+def _get_base_url(request: Request, config: Any) -> str:
+    """Return the base URL used to build links back to this service."""
+    base_url: str | None = config.get_public_base_url()
+    return base_url or str(request.base_url).rstrip("/")
+
+
+def _stale_headers(stale_feeds: list[RSSFeed]) -> dict[str, str]:
+    """Return the headers listing the feeds served from a stale cache."""
+    if not stale_feeds:
+        return {}
+    return {"X-Stale-Feeds": ",".join(str(feed.id) for feed in stale_feeds)}
+
+
+def _episode_url(
+    episode: Episode,
+    feed: RSSFeed,
+    config: Any,
+    audio_cache: AudioCacheService | None,
+    base_url: str | None,
+) -> str:
+    """Return the URL to put in a playlist, preferring the local audio cache."""
+    if audio_cache is None or not base_url or not config.use_local_audio_urls():
+        return str(episode.url)
+    local_url = audio_cache.local_url(feed.id, episode, base_url)
+    return local_url or str(episode.url)
+
+
+def _first_seen(episode_index: EpisodeIndex | None) -> Callable[[int, Episode], bool]:
+    """Return the predicate dropping the episodes already in the playlist."""
+    if episode_index is None:
+        return lambda feed_id, episode: True
+    first_seen: Callable[[int, Episode], bool] = episode_index.deduplicator()
+    return first_seen
+
+
 async def _generate_m3u_content(
-    rss_service: RSSService, feeds: list[RSSFeed], config: Any, format_type: str = "m3u"
+    rss_service: RSSService,
+    feeds: list[RSSFeed],
+    config: Any,
+    format_type: str = "m3u",
+    audio_cache: AudioCacheService | None = None,
+    base_url: str | None = None,
+    episode_index: EpisodeIndex | None = None,
 ) -> str:
     """Generate M3U or M3U8 playlist content."""
     playlist_lines = ["#EXTM3U"]
@@ -36,17 +85,20 @@ async def _generate_m3u_content(
         playlist_lines.append("http://localhost/dummy.mp3")
         return "\n".join(playlist_lines)
 
-    # Retrieve episodes
+    # Retrieve episodes, skipping the ones already listed by another feed
+    first_seen = _first_seen(episode_index)
     episodes_added = False
     for i, feed in enumerate(feeds):
         try:
-            episode = await rss_service.get_latest_episode(feed)
-            if episode:
+            episode = rss_service.get_cached_episode(feed.id)
+            if episode and first_seen(feed.id, episode):
                 # Format for m3u/m3u8
                 playlist_lines.append(
                     f"#EXTINF:{episode.duration},{feed.name} - {episode.title}"
                 )
-                playlist_lines.append(str(episode.url))
+                playlist_lines.append(
+                    _episode_url(episode, feed, config, audio_cache, base_url)
+                )
                 episodes_added = True
         except Exception as e:
             feed_name = feed.name if i < len(feeds) else f"feed {i}"
@@ -62,25 +114,76 @@ async def _generate_m3u_content(
     return "\n".join(playlist_lines)
 
 
+async def _generate_hls_content(
+    rss_service: RSSService,
+    feeds: list[RSSFeed],
+    audio_cache: AudioCacheService,
+    hls_service: HlsService,
+    base_url: str,
+    episode_index: EpisodeIndex | None = None,
+) -> str:
+    """
+    Generate a single HLS media playlist with the segments of every episode.
+
+    Cached MP3 episodes are listed segment by segment; other episodes are
+    listed as a single segment pointing at the original URL.
+    """
+    parts: list[list[tuple[float, str, str]]] = []
+    first_seen = _first_seen(episode_index)
+
+    for feed in feeds:
+        try:
+            episode = rss_service.get_cached_episode(feed.id)
+            if not episode or not first_seen(feed.id, episode):
+                continue
+
+            title = f"{feed.name} - {episode.title}"
+            cached = audio_cache.peek(feed.id, episode)
+            if cached is not None and hls_service.supports(cached):
+                uri_prefix = f"{base_url}/hls/{feed.id}/{cached.key}/"
+                part = await hls_service.playlist_part(cached, uri_prefix, title)
+                if part:
+                    parts.append(part)
+                    continue
+            parts.append([(float(episode.duration), str(episode.url), title)])
+        except Exception as e:
+            logger.error(f"Error retrieving episodes for feed {feed.name}: {e}")
+
+    if not parts:
+        logger.warning("No episodes found for configured feeds")
+        parts.append([(0.0, "http://localhost/dummy.mp3", "No episodes found")])
+
+    content: str = PlaylistService.generate_hls_media_playlist(parts)
+    return content
+
+
 async def _generate_hasensor_content(
-    rss_service: RSSService, feeds: list[RSSFeed], config: Any
+    rss_service: RSSService,
+    feeds: list[RSSFeed],
+    config: Any,
+    audio_cache: AudioCacheService | None = None,
+    base_url: str | None = None,
+    episode_index: EpisodeIndex | None = None,
 ) -> dict[str, Any]:
     """Generate JSON content for hasensor format."""
     episodes_data = []
     episodes_added = False
+    first_seen = _first_seen(episode_index)
 
     # Retrieve episodes for each feed
     for i, feed in enumerate(feeds):
         try:
-            episode = await rss_service.get_latest_episode(feed)
-            if episode:
+            episode = rss_service.get_cached_episode(feed.id)
+            if episode and first_seen(feed.id, episode):
                 episodes_data.append(
                     {
                         "feed_id": feed.id,
                         "feed_name": feed.name,
                         "feed_description": feed.description,
                         "episode_title": episode.title,
-                        "episode_url": str(episode.url),
+                        "episode_url": _episode_url(
+                            episode, feed, config, audio_cache, base_url
+                        ),
                         "duration": episode.duration,
                     }
                 )
@@ -96,99 +199,220 @@ async def _generate_hasensor_content(
     return {"status": "success", "episodes": episodes_data}
 
 
-async def _generate_playlist(
-    rss_service: RSSService, feeds: list[RSSFeed], config: Any, format_type: str = "m3u"
-) -> str | dict[str, Any]:
+async def _refresh_feeds(
+    rss_service: RSSService, feeds: list[RSSFeed], config: Any
+) -> list[RSSFeed]:
     """
-    Generate a playlist in m3u, m3u8, or hasensor format.
+    Scrape the feeds concurrently against a shared deadline.
 
-    Args:
-        rss_service: RSS service to retrieve episodes
-        feeds: List of RSS feeds to retrieve episodes from
-        config: Application configuration
-        format_type: Playlist format type (m3u, m3u8, or hasensor)
+    The deadline is max_scrape_time from now: feeds not refreshed by then keep
+    their cached episodes.
 
     Returns:
-        Union[str, Dict[str, Any]]: Playlist content as string or JSON data
+        The feeds that could not be refreshed in time
     """
+    max_time = config.get_max_scrape_time()
+    deadline = time.monotonic() + max_time
+
     # Prepare tasks to retrieve episodes from each feed
-    tasks = []
-    for feed in feeds:
-        tasks.append(asyncio.create_task(rss_service.fetch_feed(feed)))
+    tasks = {
+        feed.id: asyncio.create_task(rss_service.fetch_feed(feed, deadline=deadline))
+        for feed in feeds
+    }
+    if not tasks:
+        return []
 
-    # Wait for all tasks to complete with timeout
-    max_time = config.get_max_scrape_time()
-    done, pending = await asyncio.wait(
-        tasks, timeout=max_time, return_when=asyncio.ALL_COMPLETED
+    # The tasks honour the deadline; the timeout is only a safety net
+    _, pending = await asyncio.wait(
+        tasks.values(), timeout=max_time, return_when=asyncio.ALL_COMPLETED
     )
 
     # Cancel remaining tasks
     for task in pending:
         task.cancel()
 
+    stale_feeds = []
+    for feed in feeds:
+        task = tasks[feed.id]
+        if (
+            task in pending
+            or task.exception() is not None
+            or not task.result()[1].success
+        ):
+            stale_feeds.append(feed)
+    if stale_feeds:
+        logger.warning(
+            f"Playlist: {len(stale_feeds)} feeds not refreshed in {max_time} seconds"
+        )
+    return stale_feeds
+
+
+async def _render_playlist(
+    rss_service: RSSService,
+    feeds: list[RSSFeed],
+    config: Any,
+    format_type: str = "m3u",
+    audio_cache: AudioCacheService | None = None,
+    base_url: str | None = None,
+    hls_service: HlsService | None = None,
+    episode_index: EpisodeIndex | None = None,
+) -> str | dict[str, Any]:
+    """Render a playlist from the cached episodes, without scraping."""
     # Generate appropriate content based on format type
+    if format_type == "m3u8" and audio_cache and hls_service and base_url:
+        return await _generate_hls_content(
+            rss_service, feeds, audio_cache, hls_service, base_url, episode_index
+        )
     if format_type == "hasensor":
-        return await _generate_hasensor_content(rss_service, feeds, config)
-    else:
-        return await _generate_m3u_content(rss_service, feeds, config, format_type)
+        return await _generate_hasensor_content(
+            rss_service, feeds, config, audio_cache, base_url, episode_index
+        )
+    return await _generate_m3u_content(
+        rss_service, feeds, config, format_type, audio_cache, base_url, episode_index
+    )
+
+
+async def _generate_playlist(
+    rss_service: RSSService,
+    feeds: list[RSSFeed],
+    config: Any,
+    format_type: str = "m3u",
+    audio_cache: AudioCacheService | None = None,
+    base_url: str | None = None,
+    hls_service: HlsService | None = None,
+    episode_index: EpisodeIndex | None = None,
+) -> tuple[str | dict[str, Any], list[RSSFeed]]:
+    """
+    Generate a playlist in m3u, m3u8, or hasensor format.
+
+    Args:
+        rss_service: RSS service to retrieve episodes
+        feeds: List of RSS feeds to retrieve episodes from
+        config: Application configuration
+        format_type: Playlist format type (m3u, m3u8, or hasensor)
+        audio_cache: Local audio cache, used to point at cached enclosures
+        base_url: Base URL of this service, used to build local audio URLs
+        hls_service: HLS segmenter, used to list cached episodes as segments
+        episode_index: Index of all the episodes, used to drop the duplicates
+
+    Returns:
+        Tuple with the playlist content (string or JSON data) and the feeds
+        that could not be refreshed in time
+    """
+    stale_feeds = await _refresh_feeds(rss_service, feeds, config)
+    content = await _render_playlist(
+        rss_service,
+        feeds,
+        config,
+        format_type,
+        audio_cache,
+        base_url,
+        hls_service,
+        episode_index,
+    )
+    return content, stale_feeds
 
 
 @router.get("/m3u", response_class=PlainTextResponse)
 async def get_m3u(
+    request: Request,
     rss_service: RSSService = rss_service_dependency,
     feeds: list[RSSFeed] = rss_feeds_dependency,
     config: Any = config_dependency,
+    audio_cache: AudioCacheService | None = audio_cache_dependency,
+    episode_index: EpisodeIndex = episode_index_dependency,
 ) -> Response:
     """Generate an m3u playlist."""
-    playlist_content = await _generate_playlist(
-        rss_service, feeds, config, format_type="m3u"
+    playlist_content, stale_feeds = await _generate_playlist(
+        rss_service,
+        feeds,
+        config,
+        format_type="m3u",
+        audio_cache=audio_cache,
+        base_url=_get_base_url(request, config),
+        episode_index=episode_index,
+    )
+    return PlainTextResponse(
+        content=playlist_content, headers=_stale_headers(stale_feeds)
     )
-    return PlainTextResponse(content=playlist_content)
 
 
 @router.get("/m3u/{path:path}", response_class=PlainTextResponse)
 async def get_m3u_with_path(
+    request: Request,
     path: str,
     rss_service: RSSService = rss_service_dependency,
     feeds: list[RSSFeed] = rss_feeds_dependency,
     config: Any = config_dependency,
+    audio_cache: AudioCacheService | None = audio_cache_dependency,
+    episode_index: EpisodeIndex = episode_index_dependency,
 ) -> Response:
     """Generate an m3u playlist regardless of the requested path after /m3u/."""
-    return await get_m3u(rss_service, feeds, config)
+    return await get_m3u(
+        request, rss_service, feeds, config, audio_cache, episode_index
+    )
 
 
 @router.get("/m3u8", response_class=PlainTextResponse)
 async def get_m3u8(
+    request: Request,
     rss_service: RSSService = rss_service_dependency,
     feeds: list[RSSFeed] = rss_feeds_dependency,
     config: Any = config_dependency,
+    audio_cache: AudioCacheService | None = audio_cache_dependency,
+    hls_service: HlsService | None = hls_service_dependency,
+    episode_index: EpisodeIndex = episode_index_dependency,
 ) -> Response:
-    """Generate an m3u8 playlist."""
-    playlist_content = await _generate_playlist(
-        rss_service, feeds, config, format_type="m3u8"
+    """Generate an m3u8 playlist (a segmented HLS playlist when HLS is enabled)."""
+    playlist_content, stale_feeds = await _generate_playlist(
+        rss_service,
+        feeds,
+        config,
+        format_type="m3u8",
+        audio_cache=audio_cache,
+        base_url=_get_base_url(request, config),
+        hls_service=hls_service,
+        episode_index=episode_index,
+    )
+    return PlainTextResponse(
+        content=playlist_content, headers=_stale_headers(stale_feeds)
     )
-    return PlainTextResponse(content=playlist_content)
 
 
 @router.get("/m3u8/{path:path}", response_class=PlainTextResponse)
 async def get_m3u8_with_path(
+    request: Request,
     path: str,
     rss_service: RSSService = rss_service_dependency,
     feeds: list[RSSFeed] = rss_feeds_dependency,
     config: Any = config_dependency,
+    audio_cache: AudioCacheService | None = audio_cache_dependency,
+    hls_service: HlsService | None = hls_service_dependency,
+    episode_index: EpisodeIndex = episode_index_dependency,
 ) -> Response:
     """Generate an m3u8 playlist regardless of the requested path after /m3u8/."""
-    return await get_m3u8(rss_service, feeds, config)
+    return await get_m3u8(
+        request, rss_service, feeds, config, audio_cache, hls_service, episode_index
+    )
 
 
 @router.get("/hasensor", response_class=JSONResponse)
 async def get_hasensor(
+    request: Request,
     rss_service: RSSService = rss_service_dependency,
     feeds: list[RSSFeed] = rss_feeds_dependency,
     config: Any = config_dependency,
+    audio_cache: AudioCacheService | None = audio_cache_dependency,
+    episode_index: EpisodeIndex = episode_index_dependency,
 ) -> Response:
     """Generate a JSON response with the latest episodes from all feeds."""
-    playlist_content = await _generate_playlist(
-        rss_service, feeds, config, format_type="hasensor"
+    playlist_content, stale_feeds = await _generate_playlist(
+        rss_service,
+        feeds,
+        config,
+        format_type="hasensor",
+        audio_cache=audio_cache,
+        base_url=_get_base_url(request, config),
+        episode_index=episode_index,
     )
-    return JSONResponse(content=playlist_content)
+    return JSONResponse(content=playlist_content, headers=_stale_headers(stale_feeds))
@@ -0,0 +1,52 @@
+from typing import Annotated
+
+from fastapi import APIRouter, Header, HTTPException, Query, Request
+from fastapi.responses import PlainTextResponse, Response
+
+from ..core.dependencies import websub_dependency
+from ..services.websub import WebSubService
+
+router = APIRouter()
+
+
+def _require_websub(websub: WebSubService | None) -> WebSubService:
+    """Return the WebSub subscriber, or raise 404 if it is disabled."""
+    if websub is None:
+        raise HTTPException(status_code=404, detail="WebSub is disabled")
+    return websub
+
+
+@router.get("/websub/{feed_id}")
+async def websub_verify(
+    feed_id: int,
+    mode: Annotated[str, Query(alias="hub.mode")],
+    topic: Annotated[str, Query(alias="hub.topic")],
+    challenge: Annotated[str, Query(alias="hub.challenge")] = "",
+    lease_seconds: Annotated[int | None, Query(alias="hub.lease_seconds")] = None,
+    websub: WebSubService | None = websub_dependency,
+) -> Response:
+    """Answer the verification of intent sent by a WebSub hub."""
+    body = _require_websub(websub).verify(
+        feed_id, mode, topic, challenge, lease_seconds
+    )
+    if body is None:
+        raise HTTPException(status_code=404, detail="Unknown subscription")
+    return PlainTextResponse(content=body)
+
+
+@router.post("/websub/{feed_id}", status_code=202)
+async def websub_content(
+    feed_id: int,
+    request: Request,
+    signature: Annotated[str | None, Header(alias="X-Hub-Signature")] = None,
+    websub: WebSubService | None = websub_dependency,
+) -> Response:
+    """
+    Receive content pushed by a WebSub hub.
+
+    Hubs expect a 2xx answer even when the content is ignored (e.g. because
+    of an invalid signature), so the outcome is only logged.
+    """
+    body = await request.body()
+    await _require_websub(websub).receive(feed_id, body, signature)
+    return Response(status_code=202)
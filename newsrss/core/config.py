@@ -1,13 +1,22 @@
 import logging
 import os
-
-from dynaconf import Dynaconf
+import tempfile
 
 from ..models.schemas import RSSFeed
+from ..services.feed_parser import ENGINE_FAST, ENGINES
 
 # Logging configuration
 logger = logging.getLogger("newsrss")
 
+# Read from the environment when the application is created, before the
+# configuration is loaded (which happens on startup)
+DEBUG_ENV = "NEWSRSS_DEBUG"
+
+
+def env_flag(name: str) -> bool:
+    """Return whether a boolean environment variable is set to a true value."""
+    return os.environ.get(name, "").strip().lower() in ("1", "true", "yes", "on")
+
 
 class AppConfig:
     """
@@ -38,7 +47,12 @@ class AppConfig:
         # Configure the logger before using it
         self.logger = logger
 
-        # Initialize Dynaconf
+        # Parsed feed list, built on first use
+        self._rss_feeds: list[RSSFeed] | None = None
+
+        # Initialize Dynaconf (imported lazily to keep module import cheap)
+        from dynaconf import Dynaconf
+
         self.settings = Dynaconf(
             envvar_prefix="NEWSRSS",
             settings_files=self.default_settings_files,
@@ -83,8 +97,103 @@ class AppConfig:
         """Returns the maximum number of scraping attempts for each feed."""
         return int(self.settings.get("max_retries", 3))  # Default: 3 attempts
 
+    def get_scrape_history_size(self) -> int:
+        """Returns the number of scrapes kept in the history of each feed."""
+        return int(self.settings.get("scrape_history_size", 50))  # Default: 50
+
+    def get_parser_engine(self) -> str:
+        """Returns the default feed parser engine ("fast" or "feedparser")."""
+        default: str = ENGINE_FAST
+        engine = str(self.settings.get("parser_engine", default)).lower()
+        if engine not in ENGINES:
+            self.logger.warning(f"Unknown parser engine {engine}, using {default}")
+            return default
+        return engine
+
+    def get_readiness_ratio(self) -> float:
+        """Returns the fraction of feeds that must be cached to report ready."""
+        return float(self.settings.get("readiness_ratio", 0.5))  # Default: 50%
+
+    def get_prewarm_timeout(self) -> int:
+        """Returns the time budget for prewarming the feeds at startup."""
+        return int(self.settings.get("prewarm_timeout", self.get_max_scrape_time()))
+
+    def get_public_base_url(self) -> str | None:
+        """Returns the externally reachable base URL, if configured."""
+        base_url = self.settings.get("public_base_url", None)
+        return str(base_url).rstrip("/") if base_url else None
+
+    def is_audio_cache_enabled(self) -> bool:
+        """Returns whether the local audio cache is enabled."""
+        return bool(self.settings.get("audio_cache_enabled", False))
+
+    def get_audio_cache_dir(self) -> str:
+        """Returns the directory used to store cached audio files."""
+        default_dir = os.path.join(tempfile.gettempdir(), "newsrss-audio")
+        return str(self.settings.get("audio_cache_dir", default_dir))
+
+    def get_audio_cache_max_bytes(self) -> int:
+        """Returns the maximum size of the audio cache in bytes."""
+        max_size_mb = int(self.settings.get("audio_cache_max_size_mb", 512))
+        return max_size_mb * 1024 * 1024  # Default: 512 MiB
+
+    def get_audio_cache_episodes(self) -> int:
+        """Returns how many of the latest episodes to prefetch for each feed."""
+        return int(self.settings.get("audio_cache_episodes", 1))  # Default: 1
+
+    def use_local_audio_urls(self) -> bool:
+        """Returns whether playlists should point at the cached audio files."""
+        return bool(self.settings.get("audio_cache_local_urls", True))
+
+    def is_hls_enabled(self) -> bool:
+        """Returns whether cached MP3 episodes are served as segmented HLS."""
+        return bool(self.settings.get("hls_enabled", False))
+
+    def get_hls_segment_duration(self) -> float:
+        """Returns the target duration of HLS segments in seconds."""
+        return float(self.settings.get("hls_segment_duration", 10))  # Default: 10s
+
+    def is_history_enabled(self) -> bool:
+        """Returns whether every episode seen is archived in the history."""
+        return bool(self.settings.get("history_enabled", False))
+
+    def get_history_path(self) -> str:
+        """Returns the path of the SQLite episode history database."""
+        default_path = os.path.join(tempfile.gettempdir(), "newsrss-history.sqlite3")
+        return str(self.settings.get("history_path", default_path))
+
+    def get_publish_dir(self) -> str | None:
+        """Returns the directory the playlists are published to, if configured."""
+        publish_dir = self.settings.get("publish_dir", None)
+        return str(publish_dir) if publish_dir else None
+
+    def get_publish_interval(self) -> int:
+        """Returns the interval between two publications of the playlists."""
+        return int(self.settings.get("publish_interval", 300))  # Default: 5 min
+
+    def is_websub_enabled(self) -> bool:
+        """Returns whether WebSub push subscriptions are enabled."""
+        return bool(self.settings.get("websub_enabled", False))
+
+    def get_websub_lease_seconds(self) -> int:
+        """Returns the lease duration requested to WebSub hubs."""
+        return int(self.settings.get("websub_lease_seconds", 86400))  # Default: 1 day
+
+    def get_websub_secret(self) -> str | None:
+        """Returns the secret used to authenticate WebSub content distribution."""
+        secret = self.settings.get("websub_secret", None)
+        return str(secret) if secret else None
+
+    def get_websub_poll_interval(self) -> int:
+        """Returns the fallback polling interval for feeds updated via WebSub."""
+        return int(self.settings.get("websub_poll_interval", 3600))  # Default: 1h
+
     def get_rss_feeds(self) -> list[RSSFeed]:
         """Returns the list of RSS feeds from configuration."""
+        # The configuration does not change at runtime: parse it only once
+        if self._rss_feeds is not None:
+            return self._rss_feeds
+
         # Access RSS_FEEDS configuration directly
         feeds_config = self.settings.get("rss_feeds", [])
 
@@ -103,6 +212,12 @@ class AppConfig:
                     url = feed_config.get("url", "")
                     description = feed_config.get("description", "")
                     timeout = feed_config.get("timeout", self.get_scrape_timeout())
+                    parser = feed_config.get("parser", None)
+                    if parser is not None and parser not in ENGINES:
+                        self.logger.warning(
+                            f"Feed {name}: Unknown parser engine {parser}, ignored"
+                        )
+                        parser = None
 
                     if url:  # Add only feeds with valid URL
                         feed = RSSFeed(
@@ -111,6 +226,7 @@ class AppConfig:
                             url=url,
                             description=description,
                             timeout=timeout,
+                            parser=parser,
                         )
                         feeds.append(feed)
                         self.logger.debug(f"Feed configured: {name} ({url})")
@@ -118,4 +234,5 @@ class AppConfig:
                     self.logger.error(f"Error in feed configuration {i}: {e}")
 
         self.logger.info(f"Loaded {len(feeds)} RSS feeds")
+        self._rss_feeds = feeds
         return feeds
@@ -1,13 +1,20 @@
 import os
 from functools import lru_cache
-from typing import TypeVar
+from typing import Any, TypeVar
 
 from fastapi import Depends
-from fastapi.templating import Jinja2Templates
 
 from ..models.schemas import RSSFeed
+from ..services.audio_cache import AudioCacheService
+from ..services.diagnostics import LoopLagMonitor
+from ..services.episode_index import EpisodeIndex
+from ..services.history import EpisodeHistoryService
+from ..services.hls import HlsService
+from ..services.publisher import StaticPublisher
 from ..services.rss import RSSService
+from ..services.websub import WebSubService
 from .config import AppConfig
+from .templates import create_templates
 
 # Define type variable for dependency
 T = TypeVar("T")
@@ -22,13 +29,97 @@ def get_config() -> AppConfig:
     return AppConfig(settings_file)
 
 
+@lru_cache(maxsize=1)
+def get_audio_cache() -> AudioCacheService | None:
+    """Returns the local audio cache, or None when it is disabled."""
+    config = get_config()
+    if not config.is_audio_cache_enabled():
+        return None
+    return AudioCacheService(
+        directory=config.get_audio_cache_dir(),
+        max_bytes=config.get_audio_cache_max_bytes(),
+        episodes_per_feed=config.get_audio_cache_episodes(),
+    )
+
+
+@lru_cache(maxsize=1)
+def get_hls_service() -> HlsService | None:
+    """Returns the HLS segmenter, or None when HLS or the audio cache is disabled."""
+    config = get_config()
+    if not config.is_hls_enabled() or not config.is_audio_cache_enabled():
+        return None
+    return HlsService(segment_duration=config.get_hls_segment_duration())
+
+
+@lru_cache(maxsize=1)
+def get_history() -> EpisodeHistoryService | None:
+    """Returns the episode history archive, or None when it is disabled."""
+    config = get_config()
+    if not config.is_history_enabled():
+        return None
+    return EpisodeHistoryService(config.get_history_path())
+
+
+@lru_cache(maxsize=1)
+def get_publisher() -> StaticPublisher | None:
+    """Returns the static playlist publisher, or None when it is disabled."""
+    publish_dir = get_config().get_publish_dir()
+    if publish_dir is None:
+        return None
+    return StaticPublisher(publish_dir)
+
+
+@lru_cache(maxsize=1)
+def get_episode_index() -> EpisodeIndex:
+    """Returns the index of the cached episodes of all feeds."""
+    return EpisodeIndex()
+
+
 @lru_cache(maxsize=1)
 def get_rss_service() -> RSSService:
     """Returns the RSS service."""
     config = get_config()
-    return RSSService(
-        timeout=config.get_scrape_timeout(), max_retries=config.get_max_retries()
+    rss_service = RSSService(
+        timeout=config.get_scrape_timeout(),
+        max_retries=config.get_max_retries(),
+        parser_engine=config.get_parser_engine(),
+        history_size=config.get_scrape_history_size(),
+    )
+    rss_service.add_refresh_listener(get_episode_index().update)
+
+    audio_cache = get_audio_cache()
+    if audio_cache is not None:
+        rss_service.add_refresh_listener(audio_cache.schedule_prefetch)
+
+    history = get_history()
+    if history is not None:
+        rss_service.add_refresh_listener(history.schedule_record)
+
+    return rss_service
+
+
+@lru_cache(maxsize=1)
+def get_websub() -> WebSubService | None:
+    """Returns the WebSub subscriber, or None when it is disabled."""
+    config = get_config()
+    if not config.is_websub_enabled():
+        return None
+
+    callback_base_url = config.get_public_base_url()
+    if not callback_base_url:
+        config.logger.warning("WebSub requires public_base_url, disabling it")
+        return None
+
+    rss_service = get_rss_service()
+    websub = WebSubService(
+        rss_service,
+        callback_base_url=callback_base_url,
+        lease_seconds=config.get_websub_lease_seconds(),
+        poll_interval=config.get_websub_poll_interval(),
+        secret=config.get_websub_secret(),
     )
+    rss_service.add_refresh_listener(websub.on_refresh)
+    return websub
 
 
 def get_rss_feeds() -> list[RSSFeed]:
@@ -39,16 +130,25 @@ def get_rss_feeds() -> list[RSSFeed]:
 
 
 @lru_cache(maxsize=1)
-def get_templates() -> Jinja2Templates:
-    """Returns Jinja2 templates."""
-    templates_dir = os.path.join(
-        os.path.dirname(os.path.dirname(__file__)), "templates"
-    )
-    return Jinja2Templates(directory=templates_dir)
+def get_loop_monitor() -> LoopLagMonitor:
+    """Returns the event loop lag monitor."""
+    return LoopLagMonitor()
+
+
+@lru_cache(maxsize=1)
+def get_templates() -> Any:
+    """Returns Jinja2 templates (jinja2 is only imported on first use)."""
+    return create_templates()
 
 
 # Creating dependencies to avoid B008 errors
 config_dependency = Depends(get_config)
 rss_service_dependency = Depends(get_rss_service)
 rss_feeds_dependency = Depends(get_rss_feeds)
+audio_cache_dependency = Depends(get_audio_cache)
+hls_service_dependency = Depends(get_hls_service)
+episode_index_dependency = Depends(get_episode_index)
+history_dependency = Depends(get_history)
+websub_dependency = Depends(get_websub)
+loop_monitor_dependency = Depends(get_loop_monitor)
 templates_dependency = Depends(get_templates)
@@ -1,10 +1,19 @@
+import asyncio
 import contextlib
 import logging
 from collections.abc import AsyncGenerator
 
 from fastapi import FastAPI
 
-from .dependencies import get_config
+from .dependencies import (
+    get_config,
+    get_history,
+    get_loop_monitor,
+    get_publisher,
+    get_rss_feeds,
+    get_rss_service,
+    get_websub,
+)
 
 # Inizializza il logger
 logger = logging.getLogger("newsrss")
@@ -13,13 +22,48 @@ logger = logging.getLogger("newsrss")
 @contextlib.asynccontextmanager
 async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
     """Gestore del ciclo di vita dell'applicazione."""
-    # Inizializzazione
-    # Inizializziamo la configurazione ma non la usiamo direttamente
-    get_config()
+    # Inizializzazione: la configurazione viene creata una sola volta, qui
+    config = get_config()
     logger.info("Inizializzazione dell'applicazione")
 
+    # Misura continua del ritardo dell'event loop (vedi /diagnostics)
+    background_tasks = [asyncio.create_task(get_loop_monitor().run())]
+
+    # Le sottoscrizioni WebSub partono con il primo scraping di ogni feed
+    websub = get_websub()
+    if websub is not None:
+        background_tasks.append(asyncio.create_task(websub.run()))
+
+    # Preriscaldamento della cache in background: /healthz risponde subito,
+    # /readyz diventa pronto quando abbastanza feed sono in cache
+    prewarm_task = asyncio.create_task(
+        get_rss_service().prewarm(get_rss_feeds(), config.get_prewarm_timeout())
+    )
+    background_tasks.append(prewarm_task)
+
+    # Pubblicazione statica delle playlist, dopo il preriscaldamento
+    publisher = get_publisher()
+    if publisher is not None:
+        from ..publish import run_publisher
+
+        background_tasks.append(
+            asyncio.create_task(
+                run_publisher(
+                    publisher, config.get_publish_interval(), startup=prewarm_task
+                )
+            )
+        )
+
     # Yield per passare il controllo all'applicazione
     yield
 
     # Pulizia
+    for task in background_tasks:
+        task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await task
+
+    history = get_history()
+    if history is not None:
+        await history.close()
     logger.info("Chiusura dell'applicazione")
@@ -0,0 +1,57 @@
+import logging
+import os
+from typing import Any
+
+from .config import env_flag
+
+logger = logging.getLogger("newsrss")
+
+# Template sources and their precompiled counterpart (built with
+# `python -m newsrss.core.templates`, e.g. while building the container image)
+TEMPLATES_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "templates")
+COMPILED_TEMPLATES_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(__file__)), "templates_compiled"
+)
+# The compiled templates are never checked against their sources, so they are
+# only used when enabled (the container image sets it after compiling them)
+COMPILED_TEMPLATES_ENV = "NEWSRSS_COMPILED_TEMPLATES"
+
+
+def _compiled_templates_enabled() -> bool:
+    """Return whether the precompiled templates may be used."""
+    return env_flag(COMPILED_TEMPLATES_ENV)
+
+
+def _create_environment(use_compiled: bool = True) -> Any:
+    """Create the Jinja2 environment, preferring precompiled templates if enabled."""
+    from jinja2 import ChoiceLoader, Environment, FileSystemLoader, ModuleLoader
+
+    loader: Any = FileSystemLoader(TEMPLATES_DIR)
+    if (
+        use_compiled
+        and _compiled_templates_enabled()
+        and os.path.isdir(COMPILED_TEMPLATES_DIR)
+    ):
+        logger.debug(f"Using precompiled templates from {COMPILED_TEMPLATES_DIR}")
+        loader = ChoiceLoader([ModuleLoader(COMPILED_TEMPLATES_DIR), loader])
+
+    return Environment(loader=loader, autoescape=True)
+
+
+def create_templates() -> Any:
+    """Create the Jinja2Templates instance used to render HTML pages."""
+    from fastapi.templating import Jinja2Templates
+
+    return Jinja2Templates(env=_create_environment())
+
+
+def compile_templates() -> None:
+    """Compile all templates to Python modules in COMPILED_TEMPLATES_DIR."""
+    env = _create_environment(use_compiled=False)
+    env.compile_templates(COMPILED_TEMPLATES_DIR, zip=None)
+    logger.info(f"Templates compiled to {COMPILED_TEMPLATES_DIR}")
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level="INFO")
+    compile_templates()
@@ -1,33 +1,54 @@
+import logging
 import os
 from collections.abc import Callable
 from typing import Annotated, TypeVar
 
-from fastapi import Depends, FastAPI, Path
+from fastapi import Depends, FastAPI, Path, Request
 from fastapi.responses import PlainTextResponse, Response
 from fastapi.staticfiles import StaticFiles
 
-from .api import home, playlist
-from .core.config import AppConfig
-from .core.dependencies import get_config, get_rss_feeds, get_rss_service
+from .api import (
+    audio,
+    diagnostics,
+    episodes,
+    health,
+    history,
+    hls,
+    home,
+    playlist,
+    websub,
+)
+from .core.config import DEBUG_ENV, AppConfig, env_flag
+from .core.dependencies import (
+    get_audio_cache,
+    get_config,
+    get_episode_index,
+    get_hls_service,
+    get_rss_feeds,
+    get_rss_service,
+)
 from .core.events import lifespan
 from .models.schemas import RSSFeed
+from .services.audio_cache import AudioCacheService
+from .services.episode_index import EpisodeIndex
+from .services.hls import HlsService
 from .services.rss import RSSService
 
 # Type variables for decorator annotations
 T = TypeVar("T")
 DecoratedCallable = Callable[..., T]
 
-# Load configuration
-config = AppConfig()
-logger = config.logger
+logger = logging.getLogger("newsrss")
 
-# Create FastAPI application
+# Create FastAPI application. The configuration is not loaded here but on
+# startup (see core.events.lifespan), so importing this module stays cheap:
+# the debug flag is read from the environment only.
 app = FastAPI(
     title="NewsRSS API",
     description="API for managing RSS feeds and generating m3u/m3u8 playlists",
     version="0.1.0",
     lifespan=lifespan,
-    debug=config.is_debug(),
+    debug=env_flag(DEBUG_ENV),
 )
 
 # Configure static paths
@@ -35,45 +56,81 @@ static_dir = os.path.join(os.path.dirname(__file__), "static")
 app.mount("/static", StaticFiles(directory=static_dir), name="static")
 
 # Include routers
+app.include_router(health.router)
+app.include_router(diagnostics.router)
 app.include_router(home.router)
 app.include_router(playlist.router)
+app.include_router(audio.router)
+app.include_router(hls.router)
+app.include_router(history.router)
+app.include_router(episodes.router)
+app.include_router(websub.router)
 
 
 # Handle m3u/m3u8 paths with subpaths
 @app.get("/m3u/{path:path}")
 async def m3u_catchall(
+    request: Request,
     path: Annotated[str, Path()],
     rss_service: Annotated[RSSService, Depends(get_rss_service)],
     feeds: Annotated[list[RSSFeed], Depends(get_rss_feeds)],
     config: Annotated[AppConfig, Depends(get_config)],
+    audio_cache: Annotated[AudioCacheService | None, Depends(get_audio_cache)],
+    episode_index: Annotated[EpisodeIndex, Depends(get_episode_index)],
 ) -> Response:
     """Captures all paths that start with /m3u/ and returns the playlist."""
-    playlist_content = await playlist._generate_playlist(
-        rss_service, feeds, config, format_type="m3u"
+    playlist_content, stale_feeds = await playlist._generate_playlist(
+        rss_service,
+        feeds,
+        config,
+        format_type="m3u",
+        audio_cache=audio_cache,
+        base_url=playlist._get_base_url(request, config),
+        episode_index=episode_index,
+    )
+    return PlainTextResponse(
+        content=playlist_content, headers=playlist._stale_headers(stale_feeds)
     )
-    return PlainTextResponse(content=playlist_content)
 
 
 @app.get("/m3u8/{path:path}")
 async def m3u8_catchall(
+    request: Request,
     path: Annotated[str, Path()],
     rss_service: Annotated[RSSService, Depends(get_rss_service)],
     feeds: Annotated[list[RSSFeed], Depends(get_rss_feeds)],
     config: Annotated[AppConfig, Depends(get_config)],
+    audio_cache: Annotated[AudioCacheService | None, Depends(get_audio_cache)],
+    hls_service: Annotated[HlsService | None, Depends(get_hls_service)],
+    episode_index: Annotated[EpisodeIndex, Depends(get_episode_index)],
 ) -> Response:
     """Captures all paths that start with /m3u8/ and returns the playlist."""
-    playlist_content = await playlist._generate_playlist(
-        rss_service, feeds, config, format_type="m3u8"
+    playlist_content, stale_feeds = await playlist._generate_playlist(
+        rss_service,
+        feeds,
+        config,
+        format_type="m3u8",
+        audio_cache=audio_cache,
+        base_url=playlist._get_base_url(request, config),
+        hls_service=hls_service,
+        episode_index=episode_index,
+    )
+    return PlainTextResponse(
+        content=playlist_content, headers=playlist._stale_headers(stale_feeds)
     )
-    return PlainTextResponse(content=playlist_content)
 
 
-if __name__ == "__main__":
+def run() -> None:
+    """Start the server with uvicorn."""
     import uvicorn
 
     port = int(os.environ.get("PORT", "8000"))
     host = os.environ.get("HOST", "0.0.0.0")
-    reload = config.is_debug()
+    reload = get_config().is_debug()
 
     logger.info(f"Starting server on {host}:{port} (reload: {reload})")
     uvicorn.run("newsrss.main:app", host=host, port=port, reload=reload)
+
+
+if __name__ == "__main__":
+    run()
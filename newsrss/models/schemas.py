@@ -9,6 +9,7 @@ class RSSFeed(BaseModel):
     description: str
     url: HttpUrl
     timeout: int
+    parser: str | None = None
 
 
 class Episode(BaseModel):
@@ -42,3 +43,35 @@ class M3UPlaylist(BaseModel):
     episodes: list[Episode]
     total_duration: int
     generated_at: datetime
+
+
+class CachedAudio(BaseModel):
+    """An episode enclosure stored in the local audio cache."""
+
+    feed_id: int
+    key: str
+    path: str
+    size: int
+    media_type: str
+
+
+class HlsSegment(BaseModel):
+    """A segment of a cached MP3 file, aligned on frame boundaries."""
+
+    offset: int
+    length: int
+    start: float
+    duration: float
+
+
+class WebSubSubscription(BaseModel):
+    """A WebSub subscription to the topic of a feed."""
+
+    feed_id: int
+    hub: str
+    topic: str
+    state: str = "pending"  # pending, active, denied
+    requested_at: datetime
+    expires_at: datetime | None = None
+    # Key of the X-Hub-Signature of the pushed content
+    secret: str = ""
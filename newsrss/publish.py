@@ -0,0 +1,158 @@
+"""
+Static publish mode: renders the playlists and writes them to a directory, so
+that they can be served by nginx or a CDN without Python on the request path.
+
+Usage:
+    python -m newsrss publish [--output-dir DIR]
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+from typing import Any
+
+from .api import playlist
+from .core.dependencies import (
+    get_audio_cache,
+    get_config,
+    get_episode_index,
+    get_history,
+    get_hls_service,
+    get_rss_feeds,
+    get_rss_service,
+)
+from .services.publisher import StaticPublisher
+
+logger = logging.getLogger("newsrss")
+
+# Format type, file name and media type of every published playlist
+OUTPUTS = (
+    ("m3u", "playlist.m3u", "text/plain; charset=utf-8"),
+    ("m3u8", "playlist.m3u8", "text/plain; charset=utf-8"),
+    ("hasensor", "hasensor.json", "application/json"),
+)
+
+
+def _encode(content: str | dict[str, Any]) -> bytes:
+    """Encode a rendered playlist like the API responses do."""
+    if isinstance(content, str):
+        return content.encode()
+    return json.dumps(content, ensure_ascii=False, separators=(",", ":")).encode()
+
+
+async def publish_once(
+    publisher: StaticPublisher, refresh: bool = True, wait_for_audio: bool = False
+) -> bool:
+    """
+    Refresh the feeds once and publish the playlists.
+
+    Args:
+        publisher: Writer of the output directory
+        refresh: Scrape the feeds first (otherwise only the cache is used)
+        wait_for_audio: Wait for the audio cache downloads started by the
+                        refresh, so that the playlists point at the local files
+
+    Returns:
+        False if no feed has any episode, in which case nothing is written
+        (a previous publication is better than an empty one)
+    """
+    config = get_config()
+    rss_service = get_rss_service()
+    feeds = get_rss_feeds()
+
+    if refresh:
+        stale_feeds = await playlist._refresh_feeds(rss_service, feeds, config)
+    else:
+        # Feeds whose last scrape failed are served from a stale cache
+        stale_feeds = []
+        for feed in feeds:
+            stats = rss_service.get_scrape_stats(feed.id)
+            if stats is None or not stats.success:
+                stale_feeds.append(feed)
+    if rss_service.cached_feeds_ratio(feeds) == 0:
+        logger.error("Publish: No episodes available, keeping previous playlists")
+        return False
+
+    audio_cache = get_audio_cache()
+    if wait_for_audio and audio_cache is not None:
+        await audio_cache.wait_for_downloads()
+
+    outputs = {}
+    for format_type, name, media_type in OUTPUTS:
+        content = await playlist._render_playlist(
+            rss_service,
+            feeds,
+            config,
+            format_type,
+            audio_cache=audio_cache,
+            base_url=config.get_public_base_url(),
+            hls_service=get_hls_service(),
+            episode_index=get_episode_index(),
+        )
+        outputs[name] = (_encode(content), media_type)
+
+    await asyncio.to_thread(
+        publisher.publish, outputs, [feed.id for feed in stale_feeds]
+    )
+    return True
+
+
+async def run_publisher(
+    publisher: StaticPublisher,
+    interval: float,
+    startup: asyncio.Task[None] | None = None,
+) -> None:
+    """
+    Publish the playlists periodically, after every refresh cycle.
+
+    Args:
+        publisher: Writer of the output directory
+        interval: Seconds between two refresh cycles
+        startup: Task filling the cache (the prewarm), awaited before the
+                 first publication, which then does not scrape again
+    """
+    refresh = True
+    if startup is not None:
+        await asyncio.wait([startup])
+        refresh = False
+
+    while True:
+        try:
+            await publish_once(publisher, refresh=refresh)
+        except Exception as e:
+            logger.error(f"Publish: Unexpected error - {e}")
+        refresh = True
+        await asyncio.sleep(interval)
+
+
+async def _publish_and_close(publisher: StaticPublisher) -> bool:
+    """
+    Publish once, then flush the services that write in the background.
+
+    The process exits right after, so the audio downloads started by the
+    refresh are awaited instead of being cancelled with the event loop.
+    """
+    try:
+        return await publish_once(publisher, wait_for_audio=True)
+    finally:
+        history = get_history()
+        if history is not None:
+            await history.close()
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m newsrss publish", description=__doc__.split("\n\n")[0]
+    )
+    parser.add_argument(
+        "--output-dir", help="output directory (default: publish_dir setting)"
+    )
+    args = parser.parse_args(argv)
+
+    output_dir = args.output_dir or get_config().get_publish_dir()
+    if not output_dir:
+        parser.error("no output directory: set publish_dir or use --output-dir")
+
+    published = asyncio.run(_publish_and_close(StaticPublisher(output_dir)))
+    return 0 if published else 1
@@ -0,0 +1,248 @@
+import asyncio
+import hashlib
+import logging
+import mimetypes
+import os
+from collections import OrderedDict
+from functools import partial
+from typing import Any, BinaryIO
+from urllib.parse import quote, urlsplit
+
+from ..models.schemas import CachedAudio, Episode, RSSFeed
+
+logger = logging.getLogger("newsrss")
+
+# Constants for downloads
+HTTP_STATUS_OK = 200
+DOWNLOAD_CHUNK_SIZE = 256 * 1024
+# Downloaded chunks are buffered and handed to a worker thread in batches
+WRITE_BATCH_SIZE = 4 * 1024 * 1024
+MAX_CONCURRENT_DOWNLOADS = 2
+DEFAULT_AUDIO_EXTENSION = ".mp3"
+MAX_EXTENSION_LENGTH = 5
+PARTIAL_SUFFIX = ".part"
+
+
+class AudioCacheService:
+    """
+    Size-bounded local disk cache for episode enclosures with LRU eviction.
+
+    Files are stored as ``<directory>/<feed_id>/<key><ext>``, where ``key`` is
+    derived from the episode GUID, so the cache can be rebuilt from disk after
+    a restart without any extra metadata.
+    """
+
+    def __init__(self, directory: str, max_bytes: int, episodes_per_feed: int = 1):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.episodes_per_feed = episodes_per_feed
+        self.total_bytes = 0
+        self._entries: OrderedDict[tuple[int, str], CachedAudio] = OrderedDict()
+        self._downloads: dict[tuple[int, str], asyncio.Task[None]] = {}
+        self._semaphore = asyncio.Semaphore(MAX_CONCURRENT_DOWNLOADS)
+        self._load()
+
+    @staticmethod
+    def episode_id(episode: Episode) -> str:
+        """Return the identifier used in local URLs for an episode."""
+        return episode.guid or str(episode.url)
+
+    @staticmethod
+    def key_for(episode_id: str) -> str:
+        """Return the cache key (and file name stem) for an episode identifier."""
+        return hashlib.sha256(episode_id.encode("utf-8")).hexdigest()[:32]
+
+    def _load(self) -> None:
+        """Rebuild the in-memory index from the files already on disk."""
+        os.makedirs(self.directory, exist_ok=True)
+        found: list[tuple[float, CachedAudio]] = []
+
+        for feed_dir in os.scandir(self.directory):
+            if not feed_dir.is_dir() or not feed_dir.name.isdigit():
+                continue
+            for item in os.scandir(feed_dir.path):
+                if not item.is_file():
+                    continue
+                if item.name.endswith(PARTIAL_SUFFIX):
+                    # Leftover of an interrupted download
+                    os.unlink(item.path)
+                    continue
+                key, ext = os.path.splitext(item.name)
+                stat = item.stat()
+                found.append(
+                    (
+                        stat.st_mtime,
+                        CachedAudio(
+                            feed_id=int(feed_dir.name),
+                            key=key,
+                            path=item.path,
+                            size=stat.st_size,
+                            media_type=self._media_type(ext),
+                        ),
+                    )
+                )
+
+        # Oldest files first, so they are the first to be evicted
+        for _, entry in sorted(found, key=lambda x: x[0]):
+            self._entries[(entry.feed_id, entry.key)] = entry
+            self.total_bytes += entry.size
+
+        logger.info(
+            f"Audio cache: {len(self._entries)} files "
+            f"({self.total_bytes} bytes) loaded from {self.directory}"
+        )
+        self._evict()
+
+    @staticmethod
+    def _media_type(ext: str) -> str:
+        """Guess the media type of a cached file from its extension."""
+        return mimetypes.types_map.get(ext.lower(), "audio/mpeg")
+
+    def get(self, feed_id: int, episode_id: str) -> CachedAudio | None:
+        """Return the cached file for an episode and mark it as recently used."""
+        return self.get_by_key(feed_id, self.key_for(episode_id))
+
+    def get_by_key(self, feed_id: int, key: str) -> CachedAudio | None:
+        """Return the cached file with the given key and mark it as recently used."""
+        cache_key = (feed_id, key)
+        entry = self._entries.get(cache_key)
+        if entry is None:
+            return None
+
+        if not os.path.exists(entry.path):
+            logger.warning(f"Audio cache: {entry.path} disappeared from disk")
+            self._remove(cache_key)
+            return None
+
+        self._entries.move_to_end(cache_key)
+        return entry
+
+    def peek(self, feed_id: int, episode: Episode) -> CachedAudio | None:
+        """Return the cached file for an episode without touching the LRU order."""
+        return self._entries.get((feed_id, self.key_for(self.episode_id(episode))))
+
+    def local_url(self, feed_id: int, episode: Episode, base_url: str) -> str | None:
+        """Return the local URL of an episode, or None if it is not cached."""
+        episode_id = self.episode_id(episode)
+        if (feed_id, self.key_for(episode_id)) not in self._entries:
+            return None
+        return f"{base_url.rstrip('/')}/audio/{feed_id}/{quote(episode_id, safe='')}"
+
+    def schedule_prefetch(self, feed: RSSFeed, episodes: list[Episode]) -> None:
+        """Start background downloads for the latest episodes of a feed."""
+        for episode in episodes[: self.episodes_per_feed]:
+            cache_key = (feed.id, self.key_for(self.episode_id(episode)))
+            if cache_key in self._entries or cache_key in self._downloads:
+                continue
+
+            task = asyncio.create_task(self._download(feed, episode, cache_key[1]))
+            self._downloads[cache_key] = task
+            task.add_done_callback(partial(self._forget_download, cache_key))
+
+    async def wait_for_downloads(self) -> None:
+        """Wait for the downloads in progress (their failures are logged)."""
+        await asyncio.gather(*self._downloads.values(), return_exceptions=True)
+
+    def _forget_download(
+        self, cache_key: tuple[int, str], task: asyncio.Task[None]
+    ) -> None:
+        """Remove a finished download from the in-flight map."""
+        self._downloads.pop(cache_key, None)
+
+    async def _download(self, feed: RSSFeed, episode: Episode, key: str) -> None:
+        """Download an enclosure into the cache."""
+        import aiohttp
+
+        ext = os.path.splitext(urlsplit(str(episode.url)).path)[1]
+        if not ext or len(ext) > MAX_EXTENSION_LENGTH:
+            ext = DEFAULT_AUDIO_EXTENSION
+
+        feed_dir = os.path.join(self.directory, str(feed.id))
+        path = os.path.join(feed_dir, f"{key}{ext}")
+        partial_path = f"{path}{PARTIAL_SUFFIX}"
+        os.makedirs(feed_dir, exist_ok=True)
+
+        async with self._semaphore:
+            logger.debug(f"Feed {feed.name}: Caching audio {episode.url}")
+            size = 0
+            try:
+                timeout = aiohttp.ClientTimeout(total=None, sock_read=feed.timeout)
+                async with aiohttp.ClientSession(timeout=timeout) as session:
+                    async with session.get(str(episode.url)) as response:
+                        if response.status != HTTP_STATUS_OK:
+                            logger.warning(
+                                f"Feed {feed.name}: Audio download returned "
+                                f"HTTP {response.status}"
+                            )
+                            return
+                        size = await self._save(response, partial_path, path)
+            except (aiohttp.ClientError, TimeoutError, OSError, ValueError) as e:
+                logger.warning(f"Feed {feed.name}: Audio caching failed - {e}")
+                if os.path.exists(partial_path):
+                    os.unlink(partial_path)
+                return
+
+        entry = CachedAudio(
+            feed_id=feed.id,
+            key=key,
+            path=path,
+            size=size,
+            media_type=self._media_type(ext),
+        )
+        self._entries[(feed.id, key)] = entry
+        self.total_bytes += size
+        logger.info(f"Feed {feed.name}: Cached audio for '{episode.title}'")
+        self._evict()
+
+    async def _save(self, response: Any, partial_path: str, path: str) -> int:
+        """
+        Write the body of a download to the cache and return its size.
+
+        The chunks are written in batches of WRITE_BATCH_SIZE bytes by a worker
+        thread, which also syncs the file and moves it in place, so that large
+        enclosures do not block the event loop.
+        """
+        size = 0
+        batch: list[bytes] = []
+        batch_size = 0
+        f = await asyncio.to_thread(open, partial_path, "wb")
+        try:
+            async for chunk in response.content.iter_chunked(DOWNLOAD_CHUNK_SIZE):
+                size += len(chunk)
+                if size > self.max_bytes:
+                    raise ValueError("file larger than the cache")
+                batch.append(chunk)
+                batch_size += len(chunk)
+                if batch_size >= WRITE_BATCH_SIZE:
+                    await asyncio.to_thread(f.writelines, batch)
+                    batch, batch_size = [], 0
+            await asyncio.to_thread(self._finish, f, batch, partial_path, path)
+        finally:
+            if not f.closed:
+                await asyncio.to_thread(f.close)
+        return size
+
+    @staticmethod
+    def _finish(f: BinaryIO, batch: list[bytes], partial_path: str, path: str) -> None:
+        """Write the last chunks, sync and close the file, then move it in place."""
+        with f:
+            f.writelines(batch)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(partial_path, path)
+
+    def _remove(self, cache_key: tuple[int, str]) -> None:
+        """Drop an entry from the index and delete its file."""
+        entry = self._entries.pop(cache_key)
+        self.total_bytes -= entry.size
+        try:
+            os.unlink(entry.path)
+        except FileNotFoundError:
+            pass
+
+    def _evict(self) -> None:
+        """Evict least recently used files until the cache fits its size limit."""
+        while self.total_bytes > self.max_bytes and len(self._entries) > 1:
+            cache_key = next(iter(self._entries))
+            logger.debug(f"Audio cache: Evicting {self._entries[cache_key].path}")
+            self._remove(cache_key)
@@ -0,0 +1,162 @@
+import asyncio
+import logging
+import sys
+import time
+from collections import deque
+from datetime import UTC, datetime
+from typing import Any
+
+from ..models.schemas import Episode, RSSFeed
+from .history import parse_published
+from .rss import RSSService
+
+logger = logging.getLogger("newsrss")
+
+PROC_STATUS_PATH = "/proc/self/status"
+KIB = 1024
+
+
+def process_memory() -> dict[str, int | None]:
+    """
+    Return the resident set size of the process, in bytes.
+
+    The current RSS is read from /proc (Linux only); the peak RSS comes from
+    getrusage where available.
+    """
+    rss = peak = None
+    try:
+        with open(PROC_STATUS_PATH) as f:
+            for line in f:
+                if line.startswith(("VmRSS:", "VmHWM:")):
+                    value = int(line.split()[1]) * KIB
+                    if line.startswith("VmRSS:"):
+                        rss = value
+                    else:
+                        peak = value
+    except (OSError, ValueError):
+        pass
+
+    if peak is None:
+        try:
+            import resource
+
+            max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+            # Kilobytes on Linux, bytes on macOS
+            peak = max_rss if sys.platform == "darwin" else max_rss * KIB
+        except ImportError:
+            pass
+
+    return {"rss_bytes": rss, "peak_rss_bytes": peak}
+
+
+def shallow_size(episodes: list[Episode]) -> int:
+    """
+    Estimate the memory used by cached episodes, cheaply.
+
+    Counts the list, the models, their field dicts and the field values, but
+    not the objects nested in the values (e.g. the parts of the URLs).
+    """
+    size = sys.getsizeof(episodes)
+    for episode in episodes:
+        fields = episode.__dict__
+        size += sys.getsizeof(episode) + sys.getsizeof(fields)
+        size += sum(sys.getsizeof(value) for value in fields.values())
+    return size
+
+
+def deep_size(episodes: list[Episode]) -> int:
+    """
+    Measure the memory retained by cached episodes, recursively.
+
+    Containers and object attributes are walked down to the strings and
+    numbers they hold; objects reachable more than once (e.g. shared strings)
+    are counted once. Slow on a large cache, meant for debugging.
+    """
+    seen: set[int] = set()
+    size = 0
+    pending: list[Any] = [episodes]
+    while pending:
+        obj = pending.pop()
+        if id(obj) in seen:
+            continue
+        seen.add(id(obj))
+        size += sys.getsizeof(obj)
+        if isinstance(obj, dict):
+            pending.extend(obj.keys())
+            pending.extend(obj.values())
+        elif isinstance(obj, list | tuple | set | frozenset):
+            pending.extend(obj)
+        elif isinstance(getattr(obj, "__dict__", None), dict):
+            pending.append(obj.__dict__)
+    return size
+
+
+def _newest_published(episodes: list[Episode]) -> datetime | None:
+    """Return the most recent publication date of a list of episodes."""
+    dates = [parse_published(episode.published) for episode in episodes]
+    return max((date for date in dates if date is not None), default=None)
+
+
+def feed_cache_report(
+    rss_service: RSSService, feed: RSSFeed, deep: bool = False
+) -> dict[str, Any]:
+    """Describe the cached episodes of a feed and how they are used."""
+    episodes = rss_service.episodes_cache.get(feed.id, [])
+    newest = _newest_published(episodes)
+    last_refresh = rss_service.last_refresh.get(feed.id)
+    now = time.monotonic()
+
+    report: dict[str, Any] = {
+        "feed_id": feed.id,
+        "name": feed.name,
+        "episodes": len(episodes),
+        "approx_bytes": shallow_size(episodes),
+        "newest_episode_age_seconds": (
+            round((datetime.now(UTC) - newest).total_seconds(), 1) if newest else None
+        ),
+        "seconds_since_refresh": (
+            round(now - last_refresh, 1) if last_refresh is not None else None
+        ),
+        "cache_hits": rss_service.cache_hits.get(feed.id, 0),
+        "cache_misses": rss_service.cache_misses.get(feed.id, 0),
+    }
+    if deep:
+        report["deep_bytes"] = deep_size(episodes)
+    return report
+
+
+class LoopLagMonitor:
+    """
+    Measures the event loop lag: how late a periodic sleep wakes up.
+
+    A lag that keeps growing means that something blocks the loop (CPU-bound
+    work or blocking I/O in a coroutine).
+    """
+
+    def __init__(self, interval: float = 0.5, window: int = 120):
+        self.interval = interval
+        # Lags of the last samples (one minute with the defaults)
+        self._lags: deque[float] = deque(maxlen=window)
+        self.max_lag = 0.0
+
+    async def run(self) -> None:
+        """Sample the lag forever."""
+        while True:
+            start = time.monotonic()
+            await asyncio.sleep(self.interval)
+            lag = max(0.0, time.monotonic() - start - self.interval)
+            self._lags.append(lag)
+            self.max_lag = max(self.max_lag, lag)
+
+    def summary(self) -> dict[str, float | None]:
+        """Return the current, average and maximum lags, in milliseconds."""
+        if not self._lags:
+            return dict.fromkeys(
+                ("current_ms", "window_avg_ms", "window_max_ms", "max_ms")
+            )
+        return {
+            "current_ms": round(self._lags[-1] * 1000, 2),
+            "window_avg_ms": round(sum(self._lags) / len(self._lags) * 1000, 2),
+            "window_max_ms": round(max(self._lags) * 1000, 2),
+            "max_ms": round(self.max_lag * 1000, 2),
+        }
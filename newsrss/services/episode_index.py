@@ -0,0 +1,164 @@
+import logging
+from collections.abc import Callable
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+from ..models.schemas import Episode, RSSFeed
+
+logger = logging.getLogger("newsrss")
+
+DEFAULT_PORTS = {"http": 80, "https": 443}
+TRACKING_PARAM_PREFIXES = ("utm_",)
+# Short GUIDs ("1", "ep-12") are only unique within their feed
+MIN_GLOBAL_GUID_LENGTH = 16
+
+
+def normalize_url(url: str) -> str:
+    """
+    Normalize an enclosure URL, so that the same audio gets the same key.
+
+    The scheme, the default port, the fragment and tracking parameters are
+    dropped and the host is lowercased.
+    """
+    parts = urlsplit(url.strip())
+    host = (parts.hostname or "").lower()
+    try:
+        port = parts.port
+    except ValueError:
+        port = None
+    if port and port != DEFAULT_PORTS.get(parts.scheme.lower()):
+        host = f"{host}:{port}"
+
+    query = parts.query
+    if query:
+        params = [
+            (name, value)
+            for name, value in parse_qsl(query, keep_blank_values=True)
+            if not name.lower().startswith(TRACKING_PARAM_PREFIXES)
+        ]
+        query = urlencode(params)
+    return f"{host}{parts.path or '/'}" + (f"?{query}" if query else "")
+
+
+def _is_global_guid(guid: str) -> bool:
+    """Return whether a GUID can identify an episode across feeds."""
+    return (
+        "://" in guid or guid.startswith("urn:") or len(guid) >= MIN_GLOBAL_GUID_LENGTH
+    )
+
+
+class EpisodeIndex:
+    """
+    Index of the cached episodes of all feeds, by GUID and by normalized URL.
+
+    Only globally unique GUIDs (see ``_is_global_guid``) and normalized URLs are
+    shared across feeds; other GUIDs are indexed within their own feed, since
+    unrelated episodes of different feeds may have the same short GUID.
+
+    Kept up to date by a refresh listener: each refresh replaces the entries
+    of a single feed, so the cost is proportional to that feed only.
+    """
+
+    def __init__(self) -> None:
+        self._by_guid: dict[str, dict[int, Episode]] = {}
+        self._by_url: dict[str, dict[int, Episode]] = {}
+        self._feed_guids: dict[int, dict[str, Episode]] = {}
+        # Keys contributed by each feed, and the normalized URL of its episodes
+        self._feed_keys: dict[int, tuple[set[str], set[str]]] = {}
+        self._normalized_urls: dict[int, dict[str, str]] = {}
+
+    def __len__(self) -> int:
+        return len(self._by_url)
+
+    @staticmethod
+    def _replace(
+        index: dict[str, dict[int, Episode]],
+        feed_id: int,
+        old_keys: set[str],
+        entries: dict[str, Episode],
+    ) -> None:
+        """Replace the entries of a feed in one of the indexes."""
+        for key in old_keys - entries.keys():
+            episodes = index.get(key)
+            if episodes is not None:
+                episodes.pop(feed_id, None)
+                if not episodes:
+                    del index[key]
+        for key, episode in entries.items():
+            index.setdefault(key, {})[feed_id] = episode
+
+    def update(self, feed: RSSFeed, episodes: list[Episode]) -> None:
+        """Replace the episodes of a feed (refresh listener)."""
+        normalized = {}
+        by_guid: dict[str, Episode] = {}
+        by_url: dict[str, Episode] = {}
+        feed_guids: dict[str, Episode] = {}
+        # Reversed, so that the first (most recent) episode wins on duplicates
+        for episode in reversed(episodes):
+            url = str(episode.url)
+            normalized[url] = normalize_url(url)
+            by_url[normalized[url]] = episode
+            if not episode.guid:
+                continue
+            if _is_global_guid(episode.guid):
+                by_guid[episode.guid] = episode
+            else:
+                feed_guids[episode.guid] = episode
+
+        old_guids, old_urls = self._feed_keys.get(feed.id, (set(), set()))
+        self._replace(self._by_guid, feed.id, old_guids, by_guid)
+        self._replace(self._by_url, feed.id, old_urls, by_url)
+        self._feed_keys[feed.id] = (set(by_guid), set(by_url))
+        self._feed_guids[feed.id] = feed_guids
+        self._normalized_urls[feed.id] = normalized
+
+    def lookup(self, guid: str, feed_id: int | None = None) -> dict[int, Episode]:
+        """
+        Return the episodes with a GUID (or enclosure URL), by feed ID.
+
+        Globally unique GUIDs and enclosure URLs match the episode in every
+        feed; other GUIDs only match within the given feed.
+
+        Args:
+            guid: The GUID of the episode; enclosure URLs are accepted too
+            feed_id: Restrict the lookup to a feed (required for short GUIDs)
+        """
+        if feed_id is not None:
+            episode = self._feed_guids.get(feed_id, {}).get(guid)
+            if episode is not None:
+                return {feed_id: episode}
+
+        episodes = self._by_guid.get(guid)
+        if episodes is None:
+            episodes = self._by_url.get(normalize_url(guid))
+        if not episodes:
+            return {}
+        if feed_id is not None:
+            return {feed_id: episodes[feed_id]} if feed_id in episodes else {}
+        return dict(episodes)
+
+    def _url_key(self, feed_id: int, episode: Episode) -> str:
+        """Return the normalized URL of an episode, computed at refresh time."""
+        url = str(episode.url)
+        key = self._normalized_urls.get(feed_id, {}).get(url)
+        return key if key is not None else normalize_url(url)
+
+    def deduplicator(self) -> Callable[[int, Episode], bool]:
+        """
+        Return a predicate that accepts an episode only the first time it is seen.
+
+        Episodes are the same if they share the normalized enclosure URL or a
+        globally unique GUID. Each call is O(1); use one predicate per render.
+        """
+        seen: set[tuple[str, str]] = set()
+
+        def first_seen(feed_id: int, episode: Episode) -> bool:
+            keys = [("url", self._url_key(feed_id, episode))]
+            if episode.guid and _is_global_guid(episode.guid):
+                keys.append(("guid", episode.guid))
+            if any(key in seen for key in keys):
+                logger.debug(f"Duplicate episode skipped: {episode.title}")
+                return False
+            seen.update(keys)
+            return True
+
+        return first_seen
@@ -0,0 +1,232 @@
+import asyncio
+import logging
+import os
+import sqlite3
+import threading
+from datetime import UTC, datetime, timedelta
+from email.utils import parsedate_to_datetime
+from typing import Any
+
+from ..models.schemas import Episode, RSSFeed
+
+logger = logging.getLogger("newsrss")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS episodes (
+    feed_id INTEGER NOT NULL,
+    guid TEXT NOT NULL,
+    published_ts INTEGER,
+    first_seen_ts INTEGER NOT NULL,
+    title TEXT NOT NULL,
+    url TEXT NOT NULL,
+    duration INTEGER NOT NULL,
+    published TEXT NOT NULL,
+    PRIMARY KEY (feed_id, guid)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS episodes_published_ts
+    ON episodes (published_ts, feed_id);
+"""
+
+COLUMNS = "feed_id, guid, published_ts, first_seen_ts, title, url, duration, published"
+
+
+def parse_published(value: str) -> datetime | None:
+    """Parse an RSS (RFC 822) or ISO 8601 publication date into an aware datetime."""
+    if not value:
+        return None
+    try:
+        parsed = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        try:
+            parsed = datetime.fromisoformat(value)
+        except ValueError:
+            return None
+    # Dates without a timezone are assumed to be UTC
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=UTC)
+
+
+def _to_timestamp(value: datetime) -> int:
+    """Convert a datetime (naive values are UTC) to a Unix timestamp."""
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=UTC)
+    return int(value.timestamp())
+
+
+def _row_to_dict(row: tuple[Any, ...]) -> dict[str, Any]:
+    """Convert a database row to the JSON representation of an episode."""
+    feed_id, guid, published_ts, first_seen_ts, title, url, duration, published = row
+    return {
+        "feed_id": feed_id,
+        "guid": guid,
+        "title": title,
+        "url": url,
+        "duration": duration,
+        "published": published,
+        "published_at": (
+            datetime.fromtimestamp(published_ts, UTC).isoformat()
+            if published_ts is not None
+            else None
+        ),
+        "first_seen_at": datetime.fromtimestamp(first_seen_ts, UTC).isoformat(),
+    }
+
+
+class EpisodeHistoryService:
+    """
+    Append-only archive of every episode ever seen, stored in SQLite.
+
+    Episodes are keyed by feed and GUID and indexed by publication time. Rows
+    are never updated or deleted: a GUID is inserted the first time it is seen.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        # The connection is shared by the worker threads, guarded by a lock
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(SCHEMA)
+
+        # GUIDs of the last scrape of each feed, to skip unchanged feeds
+        self._last_seen: dict[int, set[str]] = {}
+        self._tasks: set[asyncio.Task[None]] = set()
+        logger.info(f"Episode history stored in {path}")
+
+    @staticmethod
+    def _guid(episode: Episode) -> str:
+        """Return the key of an episode (its URL when the GUID is missing)."""
+        return episode.guid or str(episode.url)
+
+    def schedule_record(self, feed: RSSFeed, episodes: list[Episode]) -> None:
+        """Archive the new episodes of a feed in the background."""
+        guids = {self._guid(episode) for episode in episodes}
+        seen = self._last_seen.get(feed.id, set())
+        new_episodes = [e for e in episodes if self._guid(e) not in seen]
+        if not new_episodes:
+            self._last_seen[feed.id] = guids
+            return
+
+        task = asyncio.create_task(self._record(feed, guids, new_episodes))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _record(
+        self, feed: RSSFeed, guids: set[str], episodes: list[Episode]
+    ) -> None:
+        """Insert new episodes, then remember the GUIDs of the scrape."""
+        try:
+            await asyncio.to_thread(self._insert, episodes)
+        except sqlite3.Error as e:
+            # The GUIDs are not remembered, so the next scrape tries again
+            logger.warning(f"Feed {feed.name}: Episode history write failed - {e}")
+            return
+        self._last_seen[feed.id] = guids
+
+    def _insert(self, episodes: list[Episode]) -> None:
+        """Insert episodes whose GUID is not in the archive yet."""
+        now = int(datetime.now(UTC).timestamp())
+        rows = []
+        for episode in episodes:
+            published_at = parse_published(episode.published)
+            rows.append(
+                (
+                    episode.feed_id,
+                    self._guid(episode),
+                    _to_timestamp(published_at) if published_at else None,
+                    now,
+                    episode.title,
+                    str(episode.url),
+                    episode.duration,
+                    episode.published,
+                )
+            )
+
+        with self._lock, self._db:
+            cursor = self._db.executemany(
+                f"INSERT OR IGNORE INTO episodes ({COLUMNS}) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+        if cursor.rowcount:
+            logger.debug(f"Episode history: {cursor.rowcount} new episodes archived")
+
+    def _select(self, where: list[str], params: list[Any], suffix: str) -> list[Any]:
+        """Run a SELECT on the archive."""
+        query = f"SELECT {COLUMNS} FROM episodes"
+        if where:
+            query += " WHERE " + " AND ".join(where)
+        with self._lock:
+            return self._db.execute(f"{query} {suffix}", params).fetchall()
+
+    @staticmethod
+    def _feed_filter(
+        feed_ids: list[int] | None, where: list[str], params: list[Any]
+    ) -> None:
+        """Add a filter on the feed IDs to a query."""
+        if feed_ids:
+            where.append(f"feed_id IN ({', '.join('?' for _ in feed_ids)})")
+            params.extend(feed_ids)
+
+    async def query(
+        self,
+        since: datetime | None = None,
+        until: datetime | None = None,
+        feed_ids: list[int] | None = None,
+        limit: int = 100,
+    ) -> list[dict[str, Any]]:
+        """Return the episodes published in a time range, most recent first."""
+        where: list[str] = []
+        params: list[Any] = []
+        if since is not None:
+            where.append("published_ts >= ?")
+            params.append(_to_timestamp(since))
+        if until is not None:
+            where.append("published_ts < ?")
+            params.append(_to_timestamp(until))
+        self._feed_filter(feed_ids, where, params)
+        params.append(limit)
+
+        rows = await asyncio.to_thread(
+            self._select, where, params, "ORDER BY published_ts DESC LIMIT ?"
+        )
+        return [_row_to_dict(row) for row in rows]
+
+    async def nearest(
+        self, at: datetime, window: timedelta, feed_ids: list[int] | None = None
+    ) -> list[dict[str, Any]]:
+        """
+        Return, for each feed, the episode published closest to a given time.
+
+        Args:
+            at: Reference time (e.g. yesterday at 8:00 for the 8 o'clock bulletin)
+            window: Maximum distance between the publication time and ``at``
+            feed_ids: Restrict the search to these feeds
+
+        Returns:
+            At most one episode per feed, ordered by feed ID
+        """
+        reference = _to_timestamp(at)
+        span = int(window.total_seconds())
+        where = ["published_ts BETWEEN ? AND ?"]
+        params: list[Any] = [reference - span, reference + span]
+        self._feed_filter(feed_ids, where, params)
+
+        rows = await asyncio.to_thread(self._select, where, params, "")
+
+        best: dict[int, tuple[Any, ...]] = {}
+        for row in rows:
+            current = best.get(row[0])
+            if current is None or abs(row[2] - reference) < abs(current[2] - reference):
+                best[row[0]] = row
+        return [_row_to_dict(best[feed_id]) for feed_id in sorted(best)]
+
+    async def close(self) -> None:
+        """Wait for the pending writes and close the database connection."""
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        with self._lock:
+            self._db.close()
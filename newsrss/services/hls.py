@@ -0,0 +1,259 @@
+import asyncio
+import logging
+import mmap
+import os
+import struct
+from collections import OrderedDict
+
+from ..models.schemas import CachedAudio, HlsSegment
+
+logger = logging.getLogger("newsrss")
+
+# MPEG audio frame header constants
+MPEG_VERSION_1 = 3
+MPEG_VERSION_2 = 2
+MPEG_VERSION_2_5 = 0
+MPEG_VERSION_RESERVED = 1
+LAYER_I = 3
+LAYER_II = 2
+LAYER_III = 1
+LAYER_RESERVED = 0
+BITRATE_INDEX_FREE = 0
+BITRATE_INDEX_BAD = 15
+SAMPLE_RATE_INDEX_RESERVED = 3
+EMPHASIS_RESERVED = 2
+FRAME_SYNC_BYTE = 0xFF
+FRAME_SYNC_MASK = 0xE0
+FRAME_HEADER_SIZE = 4
+ID3_HEADER_SIZE = 10
+
+# Bitrates in kbps, indexed by (MPEG 1 or not, layer) and then by bitrate index
+# fmt: off
+BITRATES: dict[tuple[bool, int], tuple[int, ...]] = {
+    (True, LAYER_I): (0, 32, 64, 96, 128, 160, 192, 224,
+                      256, 288, 320, 352, 384, 416, 448),
+    (True, LAYER_II): (0, 32, 48, 56, 64, 80, 96, 112,
+                       128, 160, 192, 224, 256, 320, 384),
+    (True, LAYER_III): (0, 32, 40, 48, 56, 64, 80, 96,
+                        112, 128, 160, 192, 224, 256, 320),
+    (False, LAYER_I): (0, 32, 48, 56, 64, 80, 96, 112,
+                       128, 144, 160, 176, 192, 224, 256),
+    (False, LAYER_II): (0, 8, 16, 24, 32, 40, 48, 56,
+                        64, 80, 96, 112, 128, 144, 160),
+    (False, LAYER_III): (0, 8, 16, 24, 32, 40, 48, 56,
+                         64, 80, 96, 112, 128, 144, 160),
+}
+# fmt: on
+
+SAMPLE_RATES: dict[int, tuple[int, int, int]] = {
+    MPEG_VERSION_1: (44100, 48000, 32000),
+    MPEG_VERSION_2: (22050, 24000, 16000),
+    MPEG_VERSION_2_5: (11025, 12000, 8000),
+}
+
+# Packed audio segments carry their timestamp in an ID3 PRIV frame (90 kHz clock)
+TIMESTAMP_OWNER = b"com.apple.streaming.transportStreamTimestamp\x00"
+TIMESTAMP_CLOCK = 90000
+TIMESTAMP_MASK = (1 << 33) - 1
+
+MAX_CACHED_INDEXES = 64
+
+
+def _syncsafe(value: int) -> bytes:
+    """Encode an integer as a 4-byte ID3v2 syncsafe integer."""
+    return bytes((value >> shift) & 0x7F for shift in (21, 14, 7, 0))
+
+
+def parse_frame_header(header: bytes) -> tuple[int, int, int] | None:
+    """
+    Parse an MPEG audio frame header.
+
+    Args:
+        header: The first 4 bytes of a frame
+
+    Returns:
+        Tuple with frame length in bytes, samples per frame and sample rate,
+        or None if the bytes are not a valid frame header
+    """
+    b1, b2, b3 = header[1], header[2], header[3]
+    version = (b1 >> 3) & 0x03
+    layer = (b1 >> 1) & 0x03
+    bitrate_index = (b2 >> 4) & 0x0F
+    sample_rate_index = (b2 >> 2) & 0x03
+    padding = (b2 >> 1) & 0x01
+
+    # Reserved values and free-format streams cannot be segmented
+    if (
+        header[0] != FRAME_SYNC_BYTE
+        or (b1 & FRAME_SYNC_MASK) != FRAME_SYNC_MASK
+        or version == MPEG_VERSION_RESERVED
+        or layer == LAYER_RESERVED
+        or bitrate_index in (BITRATE_INDEX_FREE, BITRATE_INDEX_BAD)
+        or sample_rate_index == SAMPLE_RATE_INDEX_RESERVED
+        or (b3 & 0x03) == EMPHASIS_RESERVED
+    ):
+        return None
+
+    is_mpeg1 = version == MPEG_VERSION_1
+    bitrate = BITRATES[(is_mpeg1, layer)][bitrate_index] * 1000
+    sample_rate = SAMPLE_RATES[version][sample_rate_index]
+
+    if layer == LAYER_I:
+        return (12 * bitrate // sample_rate + padding) * 4, 384, sample_rate
+    if layer == LAYER_III and not is_mpeg1:
+        return 72 * bitrate // sample_rate + padding, 576, sample_rate
+    return 144 * bitrate // sample_rate + padding, 1152, sample_rate
+
+
+def _skip_id3v2(data: bytes | mmap.mmap) -> int:
+    """Return the offset of the first byte after a leading ID3v2 tag."""
+    offset = 0
+    while data[offset : offset + 3] == b"ID3":
+        header = data[offset : offset + ID3_HEADER_SIZE]
+        if len(header) < ID3_HEADER_SIZE:
+            break
+        size = 0
+        for byte in header[6:10]:
+            size = (size << 7) | (byte & 0x7F)
+        footer = ID3_HEADER_SIZE if header[5] & 0x10 else 0
+        offset += ID3_HEADER_SIZE + size + footer
+    return offset
+
+
+def segment_mp3(data: bytes | mmap.mmap, target_duration: float) -> list[HlsSegment]:
+    """
+    Split MP3 data on frame boundaries into segments of about target_duration.
+
+    Each segment ends on the first frame boundary at or after the target
+    duration, so every segment but the last lasts at least target_duration.
+    Junk between frames is skipped by resynchronizing on the next valid header.
+    """
+    segments: list[HlsSegment] = []
+    size = len(data)
+    offset = _skip_id3v2(data)
+
+    segment_offset = -1
+    segment_end = 0
+    segment_duration = 0.0
+    start = 0.0
+
+    while offset + FRAME_HEADER_SIZE <= size:
+        frame = parse_frame_header(data[offset : offset + FRAME_HEADER_SIZE])
+        if frame is None or offset + frame[0] > size:
+            # Lost sync: look for the next frame header
+            offset = data.find(b"\xff", offset + 1)
+            if offset < 0:
+                break
+            continue
+
+        frame_length, samples, sample_rate = frame
+        if segment_offset < 0:
+            segment_offset = offset
+        offset += frame_length
+        segment_end = offset
+        segment_duration += samples / sample_rate
+
+        if segment_duration >= target_duration:
+            segments.append(
+                HlsSegment(
+                    offset=segment_offset,
+                    length=segment_end - segment_offset,
+                    start=start,
+                    duration=segment_duration,
+                )
+            )
+            start += segment_duration
+            segment_offset = -1
+            segment_duration = 0.0
+
+    if segment_offset >= 0:
+        segments.append(
+            HlsSegment(
+                offset=segment_offset,
+                length=segment_end - segment_offset,
+                start=start,
+                duration=segment_duration,
+            )
+        )
+    return segments
+
+
+def segment_timestamp_tag(start: float) -> bytes:
+    """Build the ID3 tag carrying the timestamp of a packed audio segment."""
+    pts = round(start * TIMESTAMP_CLOCK) & TIMESTAMP_MASK
+    payload = TIMESTAMP_OWNER + struct.pack(">Q", pts)
+    frame = b"PRIV" + _syncsafe(len(payload)) + b"\x00\x00" + payload
+    return b"ID3\x04\x00\x00" + _syncsafe(len(frame)) + frame
+
+
+def _index_file(path: str, target_duration: float) -> list[HlsSegment]:
+    """Build the segment index of an MP3 file on disk."""
+    if os.path.getsize(path) == 0:
+        return []
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as m:
+        return segment_mp3(m, target_duration)
+
+
+def _read_range(path: str, offset: int, length: int) -> bytes:
+    """Read a byte range from a file."""
+    with open(path, "rb") as f:
+        f.seek(offset)
+        return f.read(length)
+
+
+class HlsService:
+    """Serves cached MP3 episodes as HLS packed audio, without transcoding."""
+
+    def __init__(self, segment_duration: float = 10.0):
+        self.segment_duration = segment_duration
+        self._indexes: OrderedDict[tuple[str, int], list[HlsSegment]] = OrderedDict()
+
+    @staticmethod
+    def supports(cached: CachedAudio) -> bool:
+        """Return whether a cached file can be segmented."""
+        return bool(cached.media_type == "audio/mpeg")
+
+    async def get_segments(self, cached: CachedAudio) -> list[HlsSegment]:
+        """Return the segment index of a cached file, computing it on first use."""
+        index_key = (cached.path, cached.size)
+        segments = self._indexes.get(index_key)
+        if segments is not None:
+            self._indexes.move_to_end(index_key)
+            return segments
+
+        segments = await asyncio.to_thread(
+            _index_file, cached.path, self.segment_duration
+        )
+        logger.debug(f"HLS: Indexed {cached.path} into {len(segments)} segments")
+
+        self._indexes[index_key] = segments
+        if len(self._indexes) > MAX_CACHED_INDEXES:
+            self._indexes.popitem(last=False)
+        return segments
+
+    async def playlist_part(
+        self, cached: CachedAudio, uri_prefix: str, title: str = ""
+    ) -> list[tuple[float, str, str]]:
+        """
+        Return the playlist entries of a cached file.
+
+        Args:
+            cached: The cached MP3 file
+            uri_prefix: Prefix of the segment URIs (e.g. "/hls/1/<key>/")
+            title: Title attached to the first segment
+
+        Returns:
+            List of (duration, URI, title) tuples, one per segment
+        """
+        segments = await self.get_segments(cached)
+        return [
+            (segment.duration, f"{uri_prefix}{i}.mp3", title if i == 0 else "")
+            for i, segment in enumerate(segments)
+        ]
+
+    async def read_segment(self, cached: CachedAudio, segment: HlsSegment) -> bytes:
+        """Return the bytes of a segment, prefixed with its timestamp tag."""
+        data = await asyncio.to_thread(
+            _read_range, cached.path, segment.offset, segment.length
+        )
+        return segment_timestamp_tag(segment.start) + data
@@ -1,3 +1,4 @@
+import math
 from datetime import datetime
 
 from ..models.schemas import Episode, M3UPlaylist
@@ -33,6 +34,35 @@ class PlaylistService:
         playlist += "#EXT-X-ENDLIST\n"
         return playlist
 
+    @staticmethod
+    def generate_hls_media_playlist(parts: list[list[tuple[float, str, str]]]) -> str:
+        """
+        Genera una media playlist HLS (VOD) a partire da segmenti.
+
+        Args:
+            parts: Lista di episodi, ciascuno come lista di segmenti
+                   (durata, URI, titolo). Gli episodi sono separati da
+                   #EXT-X-DISCONTINUITY.
+        """
+        durations = [duration for part in parts for duration, _, _ in part]
+        target_duration = math.ceil(max(durations, default=0))
+
+        playlist = "#EXTM3U\n"
+        playlist += "#EXT-X-VERSION:3\n"
+        playlist += "#EXT-X-PLAYLIST-TYPE:VOD\n"
+        playlist += f"#EXT-X-TARGETDURATION:{target_duration}\n"
+        playlist += "#EXT-X-MEDIA-SEQUENCE:0\n"
+
+        for i, part in enumerate(parts):
+            if i > 0:
+                playlist += "#EXT-X-DISCONTINUITY\n"
+            for duration, uri, title in part:
+                playlist += f"#EXTINF:{duration:.3f},{title}\n"
+                playlist += f"{uri}\n"
+
+        playlist += "#EXT-X-ENDLIST\n"
+        return playlist
+
     @staticmethod
     def create_playlist(episodes: list[Episode], format: str = "m3u") -> M3UPlaylist:
         """Crea un oggetto playlist con metadati."""
@@ -0,0 +1,120 @@
+import gzip
+import hashlib
+import json
+import logging
+import os
+import tempfile
+from datetime import UTC, datetime
+from email.utils import format_datetime
+from typing import Any
+
+logger = logging.getLogger("newsrss")
+
+MANIFEST_NAME = "manifest.json"
+GZIP_SUFFIX = ".gz"
+
+
+def _write_atomic(path: str, data: bytes, mtime: float | None = None) -> None:
+    """Write a file atomically: readers see either the old or the new content."""
+    directory = os.path.dirname(path)
+    fd, temp_path = tempfile.mkstemp(dir=directory, prefix=".", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        # Make the file readable by the web server, like a regular file
+        os.chmod(temp_path, 0o644)
+        if mtime is not None:
+            os.utime(temp_path, (mtime, mtime))
+        os.replace(temp_path, path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+
+class StaticPublisher:
+    """
+    Publishes rendered playlists to a directory served by nginx or a CDN.
+
+    Every output is written atomically together with a gzip variant (for
+    ``gzip_static``) and described in ``manifest.json`` (ETag, size, type,
+    Last-Modified). Unchanged outputs are not rewritten, so their modification
+    time and validators stay stable across publications.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def _load_manifest(self) -> dict[str, Any]:
+        """Return the manifest of the last publication, if any."""
+        try:
+            with open(os.path.join(self.directory, MANIFEST_NAME), "rb") as f:
+                manifest: dict[str, Any] = json.load(f)
+                return manifest
+        except (OSError, ValueError):
+            return {}
+
+    def publish(
+        self, outputs: dict[str, tuple[bytes, str]], stale_feeds: list[int]
+    ) -> list[str]:
+        """
+        Write the outputs that changed since the last publication.
+
+        Args:
+            outputs: Content and media type of every file, by file name
+            stale_feeds: IDs of the feeds served from a stale cache
+
+        Returns:
+            Names of the files that were written
+        """
+        previous = self._load_manifest()
+        previous_files = previous.get("files", {})
+        files: dict[str, dict[str, Any]] = {}
+        written = []
+
+        for name, (content, media_type) in outputs.items():
+            etag = f'"{hashlib.sha256(content).hexdigest()[:32]}"'
+            path = os.path.join(self.directory, name)
+            entry = previous_files.get(name)
+            if (
+                entry
+                and entry.get("etag") == etag
+                and os.path.exists(path)
+                and os.path.exists(path + GZIP_SUFFIX)
+            ):
+                files[name] = entry
+                continue
+
+            now = datetime.now(UTC)
+            compressed = gzip.compress(content, mtime=0)
+            mtime = now.timestamp()
+            # The variant is written first, with the same modification time
+            _write_atomic(path + GZIP_SUFFIX, compressed, mtime)
+            _write_atomic(path, content, mtime)
+            files[name] = {
+                "etag": etag,
+                "size": len(content),
+                "gzip_size": len(compressed),
+                "content_type": media_type,
+                "last_modified": format_datetime(now, usegmt=True),
+            }
+            written.append(name)
+
+        stale = sorted(stale_feeds)
+        if written or previous.get("stale_feeds") != stale:
+            manifest = {
+                "published_at": datetime.now(UTC).isoformat(),
+                "stale_feeds": stale,
+                "files": files,
+            }
+            _write_atomic(
+                os.path.join(self.directory, MANIFEST_NAME),
+                json.dumps(manifest, indent=2).encode(),
+            )
+
+        if written:
+            logger.info(f"Published {', '.join(written)} to {self.directory}")
+        else:
+            logger.debug(f"Published playlists unchanged in {self.directory}")
+        return written
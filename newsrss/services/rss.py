@@ -1,40 +1,358 @@
 import asyncio
+import hashlib
 import logging
+import math
+import time
+from collections import deque
+from collections.abc import Callable
 from datetime import datetime
-from typing import Any
-
-import aiohttp
-import feedparser
+from typing import Any, NamedTuple
 
 from ..models.schemas import Episode, RSSFeed, ScrapeStats
+from .feed_parser import ENGINE_FAST, parse_feed
+from .scrape_history import (
+    OUTCOME_CACHE_FALLBACK,
+    OUTCOME_FAILED,
+    OUTCOME_FULL,
+    OUTCOME_NOT_MODIFIED,
+    OUTCOME_UNCHANGED,
+    ScrapeHistory,
+)
 
 logger = logging.getLogger("newsrss")
 
 # Constants for comparison
 HTTP_STATUS_OK = 200
+HTTP_STATUS_NOT_MODIFIED = 304
+USABLE_STATUSES = (HTTP_STATUS_OK, HTTP_STATUS_NOT_MODIFIED)
 DURATION_FORMAT_HHMMSS = 3
 DURATION_FORMAT_MMSS = 2
 
+# Latency samples kept per feed, and samples needed before hedging requests
+LATENCY_WINDOW = 20
+HEDGE_MIN_SAMPLES = 5
+HEDGE_PERCENTILE = 0.95
+# Attempts are not started with less than this time left before the deadline
+MIN_ATTEMPT_SECONDS = 0.5
+
+# Callback invoked with a feed and its freshly scraped episodes
+RefreshListener = Callable[[RSSFeed, list[Episode]], None]
+
+
+class FetchResult(NamedTuple):
+    """Response to a feed download."""
+
+    status: int
+    content: bytes
+    etag: str | None = None
+    last_modified: str | None = None
+
+
+class ScrapeError(Exception):
+    """A feed response that cannot be used (bad status, no episodes)."""
+
 
 class RSSService:
-    def __init__(self, timeout: int = 30, max_retries: int = 3):
+    def __init__(
+        self,
+        timeout: int = 30,
+        max_retries: int = 3,
+        parser_engine: str = ENGINE_FAST,
+        history_size: int = 50,
+    ):
         self.timeout = timeout
         self.max_retries = max_retries
+        # Default parser engine, overridable per feed
+        self.parser_engine = parser_engine
+        self.history_size = history_size
         self.scrape_stats: dict[int, ScrapeStats] = {}
+        # Last scrapes of each feed
+        self.scrape_history: dict[int, ScrapeHistory] = {}
         self.episodes_cache: dict[int, list[Episode]] = {}
+        # WebSub hub and topic advertised by each feed
+        self.hub_links: dict[int, tuple[str, str]] = {}
+        # Monotonic time of the last cache update of each feed
+        self.last_refresh: dict[int, float] = {}
+        # Feeds updated by other means (e.g. WebSub) are polled less often
+        self.poll_intervals: dict[int, float] = {}
+        # Durations of the recent successful downloads of each feed
+        self.latencies: dict[int, deque[float]] = {}
+        # Validators (ETag, Last-Modified) and content hash of each feed
+        self._validators: dict[int, dict[str, str]] = {}
+        self._content_hashes: dict[int, bytes] = {}
+        # Cache lookups from the serving paths, by feed
+        self.cache_hits: dict[int, int] = {}
+        self.cache_misses: dict[int, int] = {}
+        self._refresh_listeners: list[RefreshListener] = []
+
+    def add_refresh_listener(self, listener: RefreshListener) -> None:
+        """Register a callback invoked every time a feed is successfully scraped."""
+        self._refresh_listeners.append(listener)
+
+    def _notify_refresh(self, feed: RSSFeed, episodes: list[Episode]) -> None:
+        """Invoke the refresh listeners, isolating their failures."""
+        for listener in self._refresh_listeners:
+            try:
+                listener(feed, episodes)
+            except Exception as e:
+                logger.error(f"Feed {feed.name}: Refresh listener failed - {e}")
+
+    def _is_fresh(self, feed: RSSFeed) -> bool:
+        """Return whether a feed with a slow poll interval can skip polling."""
+        interval = self.poll_intervals.get(feed.id)
+        if interval is None or not self.episodes_cache.get(feed.id):
+            return False
+        return time.monotonic() - self.last_refresh.get(feed.id, 0.0) < interval
+
+    async def apply_content(
+        self, feed: RSSFeed, content: str | bytes, merge: bool = False
+    ) -> list[Episode]:
+        """
+        Parse feed content and, if it contains episodes, update the cache.
+
+        Args:
+            feed: The feed the content belongs to
+            content: The feed document, either polled or pushed by a WebSub hub
+            merge: Keep the cached episodes missing from the content (pushed
+                   content may only contain the new entries)
+
+        Returns:
+            The extracted episodes (empty if none were found)
+        """
+        parsed = parse_feed(content, feed.parser or self.parser_engine)
+        episodes = await self._extract_episodes(parsed, feed.id)
+        if not episodes:
+            return episodes
+
+        if merge and self.episodes_cache.get(feed.id):
+            pushed = {episode.guid or str(episode.url) for episode in episodes}
+            episodes = episodes + [
+                episode
+                for episode in self.episodes_cache[feed.id]
+                if (episode.guid or str(episode.url)) not in pushed
+            ]
+            # A push may only update an older entry: restore the order of a
+            # full parse (see _extract_episodes)
+            episodes.sort(key=lambda x: x.published, reverse=True)
+
+        hub_link = self._discover_hub(parsed.links, str(feed.url))
+        if hub_link:
+            self.hub_links[feed.id] = hub_link
+        self.episodes_cache[feed.id] = episodes
+        self.last_refresh[feed.id] = time.monotonic()
+        self._notify_refresh(feed, episodes)
+        return episodes
+
+    @staticmethod
+    def _discover_hub(
+        links: list[dict[str, str]], default_topic: str
+    ) -> tuple[str, str] | None:
+        """Return the WebSub hub and topic advertised by the links of a feed."""
+        hub = next((link["href"] for link in links if link.get("rel") == "hub"), None)
+        if not hub:
+            return None
+        topic = next(
+            (link["href"] for link in links if link.get("rel") == "self"),
+            default_topic,
+        )
+        return hub, topic
+
+    def _hedge_delay(self, feed_id: int) -> float | None:
+        """
+        Return the recent p95 download time of a feed, if known.
+
+        Only single downloads are measured, not whole scrapes: retries,
+        backoff and parsing would inflate the delay and disable hedging.
+        """
+        samples = self.latencies.get(feed_id)
+        if not samples or len(samples) < HEDGE_MIN_SAMPLES:
+            return None
+        ordered = sorted(samples)
+        return ordered[math.ceil(HEDGE_PERCENTILE * len(ordered)) - 1]
+
+    def _record_latency(self, feed_id: int, duration: float) -> None:
+        """Record the duration of a successful download."""
+        samples = self.latencies.setdefault(feed_id, deque(maxlen=LATENCY_WINDOW))
+        samples.append(duration)
+
+    @staticmethod
+    async def _download(
+        feed: RSSFeed, timeout: float, headers: dict[str, str]
+    ) -> FetchResult:
+        """Download a feed, returning the body only for HTTP 200 responses."""
+        import aiohttp
+
+        async with aiohttp.ClientSession() as session:
+            async with session.get(
+                str(feed.url),
+                headers=headers,
+                timeout=aiohttp.ClientTimeout(total=timeout),
+            ) as response:
+                if response.status != HTTP_STATUS_OK:
+                    return FetchResult(response.status, b"")
+                return FetchResult(
+                    response.status,
+                    await response.read(),
+                    response.headers.get("ETag"),
+                    response.headers.get("Last-Modified"),
+                )
+
+    async def _download_hedged(self, feed: RSSFeed, timeout: float) -> FetchResult:
+        """
+        Download a feed, hedging slow requests.
+
+        The request is conditional when validators of a previous response are
+        known. If it is still running after the recent p95 download time of the
+        feed, a second identical request is sent and the first usable (200 or
+        304) response wins.
+
+        Args:
+            feed: The RSS feed to download
+            timeout: Time budget for the whole download, hedge included
+        """
+        headers = self._validators.get(feed.id, {})
+        last_failure = asyncio.create_task(self._download(feed, timeout, headers))
+        pending = {last_failure}
+        try:
+            hedge_delay = self._hedge_delay(feed.id)
+            if hedge_delay is not None and hedge_delay < timeout:
+                done, _ = await asyncio.wait(pending, timeout=hedge_delay)
+                if not done:
+                    logger.debug(
+                        f"Feed {feed.name}: Slower than p95 "
+                        f"({hedge_delay:.2f}s), sending a hedged request"
+                    )
+                    pending.add(
+                        asyncio.create_task(
+                            self._download(feed, timeout - hedge_delay, headers)
+                        )
+                    )
+
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    last_failure = task
+                    if (
+                        task.exception() is None
+                        and task.result().status in USABLE_STATUSES
+                    ):
+                        return task.result()
+            # Every request failed: report the last failure (status or exception)
+            return last_failure.result()
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def _handle_response(self, feed: RSSFeed, result: FetchResult) -> str:
+        """
+        Update the cache of a feed from a download.
+
+        Returns:
+            The outcome of the scrape (full, not_modified or unchanged)
+
+        Raises:
+            ScrapeError: The response cannot be used
+        """
+        cached = bool(self.episodes_cache.get(feed.id))
+        if result.status == HTTP_STATUS_NOT_MODIFIED:
+            if not cached:
+                # Nothing to reuse: ask for the full content next time
+                self._validators.pop(feed.id, None)
+                raise ScrapeError("HTTP response 304 without cached episodes")
+            self.last_refresh[feed.id] = time.monotonic()
+            return OUTCOME_NOT_MODIFIED
+        if result.status != HTTP_STATUS_OK:
+            raise ScrapeError(f"HTTP response {result.status}")
+
+        logger.debug(
+            f"Feed {feed.name}: Content retrieved ({len(result.content)} bytes)"
+        )
+        validators = {}
+        if result.etag:
+            validators["If-None-Match"] = result.etag
+        if result.last_modified:
+            validators["If-Modified-Since"] = result.last_modified
+        self._validators[feed.id] = validators
+
+        content_hash = hashlib.sha256(result.content).digest()
+        if cached and self._content_hashes.get(feed.id) == content_hash:
+            self.last_refresh[feed.id] = time.monotonic()
+            return OUTCOME_UNCHANGED
+
+        # Extract episodes and update the cache
+        episodes = await self.apply_content(feed, result.content)
+        if not episodes:
+            raise ScrapeError("No episodes found")
+        self._content_hashes[feed.id] = content_hash
+        return OUTCOME_FULL
+
+    def _record_scrape(
+        self, feed_id: int, stats: ScrapeStats, result: FetchResult, outcome: str
+    ) -> None:
+        """Store the statistics of a scrape and add it to the feed history."""
+        self.scrape_stats[feed_id] = stats
+        history = self.scrape_history.get(feed_id)
+        if history is None:
+            history = self.scrape_history[feed_id] = ScrapeHistory(self.history_size)
+        history.record(
+            timestamp=stats.last_scrape.timestamp() if stats.last_scrape else 0.0,
+            duration=stats.last_duration,
+            size=len(result.content),
+            status=result.status,
+            outcome=outcome,
+            retries=stats.retry_count,
+        )
+
+    @staticmethod
+    def _attempt_timeout(feed: RSSFeed, deadline: float | None) -> float | None:
+        """Return the timeout of the next attempt, or None past the deadline."""
+        if deadline is None:
+            return float(feed.timeout)
+        remaining = deadline - time.monotonic()
+        if remaining < MIN_ATTEMPT_SECONDS:
+            return None
+        return min(float(feed.timeout), remaining)
+
+    @staticmethod
+    def _backoff(attempt: int, deadline: float | None) -> float | None:
+        """Return the wait before the next attempt, or None past the deadline."""
+        wait_time = float(2**attempt)  # 1, 2, 4, 8, 16 seconds
+        if deadline is None:
+            return wait_time
+        # Shorten the wait to leave time for one more attempt
+        budget = deadline - time.monotonic() - MIN_ATTEMPT_SECONDS
+        return min(wait_time, budget) if budget > 0 else None
 
     async def fetch_feed(
-        self, feed: RSSFeed
+        self, feed: RSSFeed, force: bool = False, deadline: float | None = None
     ) -> tuple[list[Episode] | None, ScrapeStats]:
         """
         Download the RSS feed and extract episodes.
 
         Args:
             feed: The RSS feed to download
+            force: Poll the feed even if it is kept fresh by WebSub
+            deadline: Monotonic time (see time.monotonic) by which the call must
+                      return; request timeouts and retry backoff are sized to
+                      the remaining budget, falling back to the cache
 
         Returns:
             Tuple with the list of episodes (or None) and statistics
         """
+        # Imported lazily to keep the application cold start fast
+        import aiohttp
+
+        if not force and self._is_fresh(feed):
+            logger.debug(f"Feed {feed.name}: Fresh from push, skipping poll")
+            cached_stats = self.scrape_stats.get(feed.id) or ScrapeStats(
+                feed_id=feed.id,
+                success=True,
+                last_episode_title=self.episodes_cache[feed.id][0].title,
+            )
+            return self.episodes_cache[feed.id], cached_stats
+
         start_time = datetime.now()
         stats = ScrapeStats(
             feed_id=feed.id,
@@ -43,88 +361,93 @@ class RSSService:
             success=False,
             last_episode_title=None,
         )
+        result = FetchResult(0, b"")
+        attempts = 0
 
         # Try to download the feed with multiple attempts
         for attempt in range(self.max_retries):
+            timeout = self._attempt_timeout(feed, deadline)
+            if timeout is None:
+                logger.debug(f"Feed {feed.name}: Deadline reached")
+                break
+
+            attempts = attempt + 1
+            stats.retry_count = attempt
+            # Status 0 is recorded when no response is received
+            result = FetchResult(0, b"")
             try:
                 logger.debug(
                     f"Feed {feed.name}: Attempt {attempt + 1}/{self.max_retries}"
                 )
-                async with aiohttp.ClientSession() as session:
-                    async with session.get(
-                        str(feed.url), timeout=feed.timeout
-                    ) as response:
-                        if response.status == HTTP_STATUS_OK:
-                            content = await response.text()
-                            logger.debug(
-                                f"Feed {feed.name}: Content retrieved "
-                                f"({len(content)} bytes)"
-                            )
-                            parsed = feedparser.parse(content)
-
-                            # Extract and format episodes
-                            episodes = await self._extract_episodes(parsed, feed.id)
-
-                            # Update cache and statistics
-                            if episodes:
-                                self.episodes_cache[feed.id] = episodes
-                                stats.success = True
-                                stats.last_episode_title = episodes[0].title
-                                logger.info(
-                                    f"Feed {feed.name}: Scraping completed "
-                                    f"successfully. Found {len(episodes)} "
-                                    f"episodes in {stats.last_duration:.2f} seconds"
-                                )
-                                stats.last_duration = (
-                                    datetime.now() - start_time
-                                ).total_seconds()
-                                self.scrape_stats[feed.id] = stats
-                                return episodes, stats
-                            else:
-                                logger.warning(f"Feed {feed.name}: No episodes found")
-                        else:
-                            logger.warning(
-                                f"Feed {feed.name}: HTTP response {response.status}"
-                            )
-            except aiohttp.ClientError as e:
-                logger.warning(f"Feed {feed.name}: Request error - {e}")
+                request_start = time.monotonic()
+                result = await self._download_hedged(feed, timeout)
+                if result.status in USABLE_STATUSES:
+                    self._record_latency(feed.id, time.monotonic() - request_start)
+                outcome = await self._handle_response(feed, result)
+
+                # Update statistics
+                episodes = self.episodes_cache[feed.id]
+                stats.success = True
+                stats.last_episode_title = episodes[0].title
+                stats.last_duration = (datetime.now() - start_time).total_seconds()
+                logger.info(
+                    f"Feed {feed.name}: Scraping completed successfully "
+                    f"({outcome}). Found {len(episodes)} episodes in "
+                    f"{stats.last_duration:.2f} seconds"
+                )
+                self._record_scrape(feed.id, stats, result, outcome)
+                return episodes, stats
+            except ScrapeError as e:
+                stats.error_message = str(e)
+                logger.warning(f"Feed {feed.name}: {e}")
+            except (aiohttp.ClientError, TimeoutError) as e:
+                stats.error_message = f"Request error - {e!r}"
+                logger.warning(f"Feed {feed.name}: {stats.error_message}")
             except Exception as e:
-                logger.error(f"Feed {feed.name}: Unexpected error - {e}")
+                stats.error_message = f"Unexpected error - {e}"
+                logger.error(f"Feed {feed.name}: {stats.error_message}")
 
             # If we got here, there was an error. Retry after a while.
             if attempt < self.max_retries - 1:
-                wait_time = 2**attempt  # 1, 2, 4, 8, 16 seconds
+                wait_time = self._backoff(attempt, deadline)
+                if wait_time is None:
+                    logger.debug(f"Feed {feed.name}: Deadline reached")
+                    break
                 logger.debug(
-                    f"Feed {feed.name}: Waiting {wait_time} seconds "
+                    f"Feed {feed.name}: Waiting {wait_time:.2f} seconds "
                     f"before next attempt"
                 )
                 await asyncio.sleep(wait_time)
 
         # All attempts failed
-        try:
-            # Try to retrieve episodes from cache
-            if feed.id in self.episodes_cache:
-                logger.warning(
-                    f"Feed {feed.name}: Using cache after "
-                    f"{self.max_retries} failed attempts"
-                )
-                stats.success = False  # Scraping failed even if we use the cache
-                stats.last_duration = (datetime.now() - start_time).total_seconds()
-                stats.last_episode_title = (
-                    self.episodes_cache[feed.id][0].title
-                    if self.episodes_cache[feed.id]
-                    else None
-                )
-                self.scrape_stats[feed.id] = stats
-                return self.episodes_cache[feed.id], stats
-        except Exception as e:
-            logger.error(f"Feed {feed.name}: Error accessing cache - {e}")
+        return self._fallback_to_cache(feed, stats, start_time, result, attempts)
 
+    def _fallback_to_cache(
+        self,
+        feed: RSSFeed,
+        stats: ScrapeStats,
+        start_time: datetime,
+        result: FetchResult,
+        attempts: int,
+    ) -> tuple[list[Episode] | None, ScrapeStats]:
+        """Return the cached episodes of a feed whose scraping failed."""
+        stats.success = False  # Scraping failed even if we use the cache
         stats.last_duration = (datetime.now() - start_time).total_seconds()
-        logger.error(
-            f"Feed {feed.name}: All {self.max_retries} scraping " f"attempts failed"
-        )
-        self.scrape_stats[feed.id] = stats
+        if not attempts:
+            stats.error_message = "Deadline reached before the first attempt"
+
+        # Try to retrieve episodes from cache
+        episodes = self.episodes_cache.get(feed.id)
+        if episodes:
+            logger.warning(
+                f"Feed {feed.name}: Using cache after {attempts} failed attempts"
+            )
+            stats.last_episode_title = episodes[0].title
+            self._record_scrape(feed.id, stats, result, OUTCOME_CACHE_FALLBACK)
+            return episodes, stats
+
+        logger.error(f"Feed {feed.name}: All {attempts} scraping attempts failed")
+        self._record_scrape(feed.id, stats, result, OUTCOME_FAILED)
         return None, stats
 
     async def _extract_episodes(self, parsed_feed: Any, feed_id: int) -> list[Episode]:
@@ -186,14 +509,73 @@ class RSSService:
         episodes.sort(key=lambda x: x.published, reverse=True)
         return episodes
 
+    async def prewarm(self, feeds: list[RSSFeed], timeout: float) -> None:
+        """Scrape all feeds concurrently to fill the cache, within a time budget."""
+        if not feeds:
+            return
+
+        start_time = datetime.now()
+        deadline = time.monotonic() + timeout
+        tasks = [
+            asyncio.create_task(self.fetch_feed(feed, deadline=deadline))
+            for feed in feeds
+        ]
+        try:
+            _, pending = await asyncio.wait(tasks, timeout=timeout)
+        finally:
+            # Also reached when the prewarm itself is cancelled on shutdown
+            for task in tasks:
+                task.cancel()
+
+        duration = (datetime.now() - start_time).total_seconds()
+        logger.info(
+            f"Prewarm: {self.cached_feeds_ratio(feeds):.0%} of the feeds cached "
+            f"in {duration:.2f} seconds ({len(pending)} feeds timed out)"
+        )
+
+    def cached_feeds_ratio(self, feeds: list[RSSFeed]) -> float:
+        """Return the fraction of feeds that have cached episodes."""
+        if not feeds:
+            return 1.0
+        cached = sum(1 for feed in feeds if self.episodes_cache.get(feed.id))
+        return cached / len(feeds)
+
     def get_scrape_stats(self, feed_id: int) -> ScrapeStats | None:
         """Return scraping statistics for a feed."""
         return self.scrape_stats.get(feed_id)
 
+    def get_scrape_summary(self, feed_id: int) -> dict[str, Any]:
+        """Return the rolling statistics of the recent scrapes of a feed."""
+        history = self.scrape_history.get(feed_id)
+        last = history.last() if history else None
+        return {
+            "scrape_count": len(history) if history else 0,
+            "success_rate": history.success_rate if history else None,
+            "p50_duration": history.percentile(0.5) if history else None,
+            "p95_duration": history.percentile(HEDGE_PERCENTILE) if history else None,
+            "last_outcome": last.outcome if last else None,
+            "last_status": last.status if last else None,
+            "last_bytes": last.size if last else None,
+            "retry_count": last.retries if last else 0,
+        }
+
+    def _count_lookup(self, feed_id: int, hit: bool) -> None:
+        """Count a cache lookup from a serving path."""
+        counters = self.cache_hits if hit else self.cache_misses
+        counters[feed_id] = counters.get(feed_id, 0) + 1
+
+    def get_cached_episode(self, feed_id: int) -> Episode | None:
+        """Return the most recent cached episode of a feed, without scraping."""
+        episodes = self.episodes_cache.get(feed_id)
+        self._count_lookup(feed_id, bool(episodes))
+        return episodes[0] if episodes else None
+
     async def get_latest_episode(self, feed: RSSFeed) -> Episode | None:
         """Return the most recent episode for a feed."""
         if self.episodes_cache.get(feed.id):
+            self._count_lookup(feed.id, True)
             return self.episodes_cache[feed.id][0]
+        self._count_lookup(feed.id, False)
         episodes, _ = await self.fetch_feed(feed)
         if episodes:
             return episodes[0]
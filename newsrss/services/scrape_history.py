@@ -0,0 +1,132 @@
+import bisect
+import math
+from array import array
+from typing import NamedTuple
+
+# Outcome of a scrape: the first three are successful
+OUTCOME_FULL = "full"  # New content, parsed
+OUTCOME_NOT_MODIFIED = "not_modified"  # HTTP 304 to a conditional request
+OUTCOME_UNCHANGED = "unchanged"  # Same content as the previous scrape
+OUTCOME_CACHE_FALLBACK = "cache_fallback"  # Failed, cached episodes served
+OUTCOME_FAILED = "failed"  # Failed, nothing cached
+OUTCOMES = (
+    OUTCOME_FULL,
+    OUTCOME_NOT_MODIFIED,
+    OUTCOME_UNCHANGED,
+    OUTCOME_CACHE_FALLBACK,
+    OUTCOME_FAILED,
+)
+SUCCESS_OUTCOMES = frozenset((OUTCOME_FULL, OUTCOME_NOT_MODIFIED, OUTCOME_UNCHANGED))
+
+
+class ScrapeRecord(NamedTuple):
+    """A scrape of a feed, as stored in the history."""
+
+    timestamp: float
+    duration: float
+    size: int
+    status: int
+    outcome: str
+    retries: int
+
+    @property
+    def success(self) -> bool:
+        return self.outcome in SUCCESS_OUTCOMES
+
+
+class ScrapeHistory:
+    """
+    Fixed-size ring buffer of the last scrapes of a feed.
+
+    Records are stored column by column in preallocated arrays. The success
+    count and the sorted durations of the successful scrapes are updated on
+    every insertion and eviction, so the rolling statistics cost no full scan.
+    """
+
+    def __init__(self, capacity: int = 50):
+        self.capacity = max(1, capacity)
+        self._timestamps = array("d", bytes(8 * self.capacity))
+        self._durations = array("d", bytes(8 * self.capacity))
+        self._sizes = array("q", bytes(8 * self.capacity))
+        self._statuses = array("h", bytes(2 * self.capacity))
+        self._outcomes = array("b", bytes(self.capacity))
+        self._retries = array("h", bytes(2 * self.capacity))
+        self._next = 0
+        self._count = 0
+        self._successes = 0
+        self._sorted_durations: list[float] = []
+
+    def __len__(self) -> int:
+        return self._count
+
+    def _is_success(self, index: int) -> bool:
+        return OUTCOMES[self._outcomes[index]] in SUCCESS_OUTCOMES
+
+    def record(
+        self,
+        timestamp: float,
+        duration: float,
+        size: int,
+        status: int,
+        outcome: str,
+        retries: int,
+    ) -> None:
+        """Add a scrape, evicting the oldest one when the buffer is full."""
+        index = self._next
+        if self._count == self.capacity and self._is_success(index):
+            # Evict the oldest scrape from the rolling statistics
+            self._successes -= 1
+            evicted = bisect.bisect_left(self._sorted_durations, self._durations[index])
+            del self._sorted_durations[evicted]
+
+        self._timestamps[index] = timestamp
+        self._durations[index] = duration
+        self._sizes[index] = size
+        self._statuses[index] = status
+        self._outcomes[index] = OUTCOMES.index(outcome)
+        self._retries[index] = retries
+        if outcome in SUCCESS_OUTCOMES:
+            self._successes += 1
+            # Store the value read back from the array, so that the eviction
+            # above finds exactly the same float
+            bisect.insort(self._sorted_durations, self._durations[index])
+
+        self._next = (index + 1) % self.capacity
+        self._count = min(self._count + 1, self.capacity)
+
+    def _get(self, index: int) -> ScrapeRecord:
+        return ScrapeRecord(
+            timestamp=self._timestamps[index],
+            duration=self._durations[index],
+            size=self._sizes[index],
+            status=self._statuses[index],
+            outcome=OUTCOMES[self._outcomes[index]],
+            retries=self._retries[index],
+        )
+
+    def records(self) -> list[ScrapeRecord]:
+        """Return the scrapes in the buffer, oldest first."""
+        start = (self._next - self._count) % self.capacity
+        return [self._get((start + i) % self.capacity) for i in range(self._count)]
+
+    def last(self) -> ScrapeRecord | None:
+        """Return the most recent scrape."""
+        if not self._count:
+            return None
+        return self._get((self._next - 1) % self.capacity)
+
+    @property
+    def success_count(self) -> int:
+        return self._successes
+
+    @property
+    def success_rate(self) -> float | None:
+        """Return the fraction of successful scrapes in the buffer."""
+        return self._successes / self._count if self._count else None
+
+    def percentile(self, fraction: float) -> float | None:
+        """Return a percentile (nearest rank) of the successful scrape durations."""
+        if not self._sorted_durations:
+            return None
+        rank = max(1, math.ceil(fraction * len(self._sorted_durations)))
+        return self._sorted_durations[rank - 1]
@@ -0,0 +1,232 @@
+import asyncio
+import hashlib
+import hmac
+import logging
+import secrets
+from collections.abc import Coroutine
+from datetime import datetime, timedelta
+from typing import Any
+
+from ..models.schemas import Episode, RSSFeed, WebSubSubscription
+from .rss import RSSService
+
+logger = logging.getLogger("newsrss")
+
+# Hubs answer 202 Accepted (asynchronous verification) or 204 No Content
+HUB_ACCEPTED_STATUSES = (202, 204)
+RENEWAL_CHECK_INTERVAL = 60
+RENEWAL_MARGIN = 0.1  # Renew when less than 10% of the lease is left
+VERIFICATION_TIMEOUT = timedelta(minutes=10)
+# Bytes of the secret generated for a subscription when none is configured
+GENERATED_SECRET_BYTES = 32
+SIGNATURE_ALGORITHMS = {
+    "sha1": hashlib.sha1,
+    "sha256": hashlib.sha256,
+    "sha384": hashlib.sha384,
+    "sha512": hashlib.sha512,
+}
+
+
+class WebSubService:
+    """
+    WebSub (PubSubHubbub) subscriber.
+
+    Subscribes to the hubs advertised by the feeds, answers the hub
+    verification requests, renews the leases and applies pushed content to the
+    episode cache. While a subscription is active, the feed is only polled
+    every ``poll_interval`` seconds as a fallback.
+
+    Every subscription has a secret (the configured one, or a random one) and
+    pushed content without a valid X-Hub-Signature is rejected, so that nobody
+    but the hub can inject episodes.
+    """
+
+    def __init__(
+        self,
+        rss_service: RSSService,
+        callback_base_url: str,
+        lease_seconds: int = 86400,
+        poll_interval: int = 3600,
+        secret: str | None = None,
+    ):
+        self.rss_service = rss_service
+        self.callback_base_url = callback_base_url.rstrip("/")
+        self.lease_seconds = lease_seconds
+        self.poll_interval = poll_interval
+        self.secret = secret
+        self.subscriptions: dict[int, WebSubSubscription] = {}
+        self._feeds: dict[int, RSSFeed] = {}
+        self._tasks: set[asyncio.Task[Any]] = set()
+
+    def callback_url(self, feed_id: int) -> str:
+        """Return the callback URL registered at the hub for a feed."""
+        return f"{self.callback_base_url}/websub/{feed_id}"
+
+    def _schedule(self, coroutine: Coroutine[Any, Any, Any]) -> None:
+        """Run a coroutine in the background, keeping a reference to it."""
+        task = asyncio.create_task(coroutine)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    def on_refresh(self, feed: RSSFeed, episodes: list[Episode]) -> None:
+        """Subscribe to the hub of a feed when it is first discovered."""
+        self._feeds[feed.id] = feed
+        hub_link = self.rss_service.hub_links.get(feed.id)
+        if hub_link is None:
+            return
+
+        subscription = self.subscriptions.get(feed.id)
+        if subscription and (subscription.hub, subscription.topic) == hub_link:
+            return
+        self._schedule(self.subscribe(feed, *hub_link))
+
+    async def subscribe(self, feed: RSSFeed, hub: str, topic: str) -> bool:
+        """
+        Send a subscription (or renewal) request to a hub.
+
+        Args:
+            feed: The feed to subscribe to
+            hub: URL of the hub
+            topic: URL of the topic (the feed's self link)
+
+        Returns:
+            True if the hub accepted the request; the subscription becomes
+            active once the hub verifies it through the callback.
+        """
+        import aiohttp
+
+        subscription = self.subscriptions.get(feed.id)
+        if (
+            subscription is None
+            or subscription.hub != hub
+            or subscription.topic != topic
+        ):
+            subscription = WebSubSubscription(
+                feed_id=feed.id,
+                hub=hub,
+                topic=topic,
+                requested_at=datetime.now(),
+                secret=self.secret or secrets.token_hex(GENERATED_SECRET_BYTES),
+            )
+            self.subscriptions[feed.id] = subscription
+        else:
+            subscription.requested_at = datetime.now()
+
+        data = {
+            "hub.mode": "subscribe",
+            "hub.topic": topic,
+            "hub.callback": self.callback_url(feed.id),
+            "hub.lease_seconds": str(self.lease_seconds),
+            "hub.secret": subscription.secret,
+        }
+
+        try:
+            async with aiohttp.ClientSession() as session:
+                async with session.post(hub, data=data, timeout=feed.timeout) as r:
+                    if r.status not in HUB_ACCEPTED_STATUSES:
+                        logger.warning(
+                            f"Feed {feed.name}: WebSub hub {hub} refused the "
+                            f"subscription (HTTP {r.status})"
+                        )
+                        return False
+        except (aiohttp.ClientError, TimeoutError) as e:
+            logger.warning(f"Feed {feed.name}: WebSub subscription error - {e}")
+            return False
+
+        logger.info(f"Feed {feed.name}: WebSub subscription requested to {hub}")
+        return True
+
+    def verify(
+        self, feed_id: int, mode: str, topic: str, challenge: str, lease: int | None
+    ) -> str | None:
+        """
+        Answer a verification request from a hub.
+
+        Returns:
+            The body of the response (the challenge for accepted requests),
+            or None if the request must be refused.
+        """
+        subscription = self.subscriptions.get(feed_id)
+        matches = subscription is not None and subscription.topic == topic
+
+        if mode == "subscribe":
+            if subscription is None or not matches:
+                return None
+            lease_seconds = lease or self.lease_seconds
+            subscription.state = "active"
+            subscription.expires_at = datetime.now() + timedelta(seconds=lease_seconds)
+            self.rss_service.poll_intervals[feed_id] = self.poll_interval
+            logger.info(f"Feed {feed_id}: WebSub subscription active")
+            return challenge
+
+        if mode == "unsubscribe":
+            # Only confirm unsubscriptions for topics we are not interested in
+            return None if matches else challenge
+
+        if mode == "denied" and subscription is not None and matches:
+            logger.warning(f"Feed {feed_id}: WebSub subscription denied by the hub")
+            subscription.state = "denied"
+            self.rss_service.poll_intervals.pop(feed_id, None)
+            return ""
+
+        return None
+
+    @staticmethod
+    def _valid_signature(body: bytes, signature: str | None, secret: str) -> bool:
+        """Check the X-Hub-Signature header of a content distribution request."""
+        if not secret or not signature or "=" not in signature:
+            return False
+
+        method, digest = signature.split("=", 1)
+        algorithm = SIGNATURE_ALGORITHMS.get(method.lower())
+        if algorithm is None:
+            return False
+        expected = hmac.new(secret.encode(), body, algorithm).hexdigest()
+        return hmac.compare_digest(expected, digest.lower())
+
+    async def receive(self, feed_id: int, body: bytes, signature: str | None) -> bool:
+        """Apply content pushed by a hub to the episode cache."""
+        subscription = self.subscriptions.get(feed_id)
+        feed = self._feeds.get(feed_id)
+        if subscription is None or subscription.state != "active" or feed is None:
+            logger.debug(f"Feed {feed_id}: Ignoring unexpected WebSub content")
+            return False
+        if not self._valid_signature(body, signature, subscription.secret):
+            logger.warning(f"Feed {feed.name}: Invalid WebSub signature, ignored")
+            return False
+
+        episodes = await self.rss_service.apply_content(feed, body, merge=True)
+        logger.info(f"Feed {feed.name}: WebSub push with {len(episodes)} episodes")
+        return True
+
+    async def run(self) -> None:
+        """Renew the leases before they expire and retry stale subscriptions."""
+        while True:
+            await asyncio.sleep(RENEWAL_CHECK_INTERVAL)
+            now = datetime.now()
+            margin = timedelta(seconds=self.lease_seconds * RENEWAL_MARGIN)
+
+            for subscription in list(self.subscriptions.values()):
+                feed = self._feeds.get(subscription.feed_id)
+                if feed is None:
+                    continue
+
+                if subscription.state == "active" and subscription.expires_at:
+                    if subscription.expires_at <= now:
+                        # Lease lost: go back to regular polling
+                        logger.warning(f"Feed {feed.name}: WebSub lease expired")
+                        subscription.state = "pending"
+                        self.rss_service.poll_intervals.pop(feed.id, None)
+                    elif subscription.expires_at - now > margin:
+                        continue
+                else:
+                    # Retry unverified requests soon, denied ones once per lease
+                    retry_after = (
+                        VERIFICATION_TIMEOUT
+                        if subscription.state == "pending"
+                        else timedelta(seconds=self.lease_seconds)
+                    )
+                    if now - subscription.requested_at < retry_after:
+                        continue
+
+                await self.subscribe(feed, subscription.hub, subscription.topic)
@@ -104,6 +104,44 @@ document.addEventListener('DOMContentLoaded', function() {
             statusElement.className = `status ml-1 ${feed.success ? 'text-green-400' : 'text-red-400'}`;
         }
 
+        // Update rolling scrape statistics
+        const percentilesEl = feedCard.querySelector('.fetch-percentiles');
+        if (percentilesEl) {
+            percentilesEl.textContent = feed.p50_duration != null
+                ? `${feed.p50_duration.toFixed(2)}s / ${feed.p95_duration.toFixed(2)}s`
+                : '-';
+        }
+
+        const successRateEl = feedCard.querySelector('.success-rate');
+        if (successRateEl) {
+            successRateEl.textContent = feed.success_rate != null
+                ? `${Math.round(feed.success_rate * 100)}% of the last ${feed.scrape_count} scrapes`
+                : '-';
+        }
+
+        const lastOutcomeEl = feedCard.querySelector('.last-outcome');
+        if (lastOutcomeEl) {
+            let outcome = feed.last_outcome || '-';
+            if (feed.last_outcome && feed.last_status) {
+                outcome += ` (HTTP ${feed.last_status})`;
+            }
+            if (feed.last_outcome && feed.retry_count) {
+                outcome += `, ${feed.retry_count} retries`;
+            }
+            lastOutcomeEl.textContent = outcome;
+        }
+
+        const errorContainer = feedCard.querySelector('.error-message-container');
+        const errorElement = feedCard.querySelector('.error-message');
+        if (errorContainer && errorElement) {
+            if (feed.error_message && !feed.success) {
+                errorContainer.style.display = 'flex';
+                errorElement.textContent = feed.error_message;
+            } else {
+                errorContainer.style.display = 'none';
+            }
+        }
+
         // Update latest episode information
         const latestEpisode = feedCard.querySelector('.latest-episode');
         if (!latestEpisode) return;
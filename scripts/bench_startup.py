@@ -0,0 +1,130 @@
+"""
+Startup benchmark: measures the import time of the application and the time
+to first byte of a freshly started server, and checks them against the budget
+tracked in pyproject.toml ([tool.newsrss.startup-budget]).
+
+Usage:
+    python scripts/bench_startup.py [--runs N] [--no-budget]
+"""
+
+import argparse
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import tomllib
+import urllib.error
+import urllib.request
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PYPROJECT = os.path.join(ROOT_DIR, "pyproject.toml")
+SERVER_START_TIMEOUT = 30.0
+POLL_INTERVAL = 0.01
+
+IMPORT_SNIPPET = (
+    "import time; t = time.perf_counter(); import newsrss.main; "
+    "print(time.perf_counter() - t)"
+)
+
+
+def _bench_env() -> dict[str, str]:
+    """Environment for the measured processes: no feeds, so no network I/O."""
+    env = dict(os.environ)
+    env["PYTHONPATH"] = ROOT_DIR
+    env["NEWSRSS_RSS_FEEDS"] = "[]"
+    env["NEWSRSS_LOG_LEVEL"] = "WARNING"
+    env.pop("NEWSRSS_SETTINGS_FILE", None)
+    return env
+
+
+def measure_import_time() -> float:
+    """Return the time needed to import the application in a fresh interpreter."""
+    output = subprocess.check_output(
+        [sys.executable, "-c", IMPORT_SNIPPET], env=_bench_env(), cwd=ROOT_DIR
+    )
+    return float(output.decode().strip().splitlines()[-1])
+
+
+def _free_port() -> int:
+    """Return a free local TCP port."""
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return int(s.getsockname()[1])
+
+
+def measure_time_to_first_byte(path: str = "/") -> float:
+    """Return the time from server process spawn to the first response byte."""
+    port = _free_port()
+    url = f"http://127.0.0.1:{port}{path}"
+    start = time.perf_counter()
+    server = subprocess.Popen(
+        [
+            sys.executable,
+            "-m",
+            "uvicorn",
+            "newsrss.main:app",
+            "--port",
+            str(port),
+            "--log-level",
+            "warning",
+        ],
+        env=_bench_env(),
+        cwd=ROOT_DIR,
+    )
+    try:
+        while time.perf_counter() - start < SERVER_START_TIMEOUT:
+            try:
+                with urllib.request.urlopen(url, timeout=SERVER_START_TIMEOUT) as r:
+                    r.read(1)
+                    return time.perf_counter() - start
+            except (ConnectionError, urllib.error.URLError):
+                time.sleep(POLL_INTERVAL)
+        raise TimeoutError(f"Server did not answer {url} in time")
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def load_budget() -> dict[str, float]:
+    """Return the startup budget tracked in pyproject.toml."""
+    with open(PYPROJECT, "rb") as f:
+        pyproject = tomllib.load(f)
+    budget = pyproject.get("tool", {}).get("newsrss", {}).get("startup-budget", {})
+    return {name: float(value) for name, value in budget.items()}
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--runs", type=int, default=5, help="measurements per metric")
+    parser.add_argument(
+        "--no-budget", action="store_true", help="report only, never fail"
+    )
+    args = parser.parse_args()
+
+    results = {
+        "import_seconds": statistics.median(
+            measure_import_time() for _ in range(args.runs)
+        ),
+        "ttfb_seconds": statistics.median(
+            measure_time_to_first_byte() for _ in range(args.runs)
+        ),
+    }
+    budget = load_budget()
+
+    over_budget = False
+    for metric, value in results.items():
+        limit = budget.get(metric)
+        status = ""
+        if limit is not None:
+            status = "OK" if value <= limit else "OVER BUDGET"
+            over_budget = over_budget or value > limit
+        limit_str = f"{limit:.3f}s" if limit is not None else "-"
+        print(f"{metric:<16} {value:.3f}s (budget {limit_str}) {status}")
+
+    return 1 if over_budget and not args.no_budget else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,128 @@
+"""
+Feed parser parity check: parses feeds with both engines (fast and
+feedparser), checks that the extracted episodes and WebSub links are the same
+and reports the parsing time of each engine.
+
+Sources can be files, directories of .xml files or URLs; without arguments
+the fixture corpus in scripts/feeds is used. With --configured, the feeds
+configured in settings.toml (or NEWSRSS_SETTINGS_FILE) are downloaded and
+checked as well.
+
+Usage:
+    python scripts/parser_parity.py [SOURCE ...] [--configured] [--runs N]
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+import urllib.request
+import xml.etree.ElementTree as ET
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FIXTURES_DIR = os.path.join(ROOT_DIR, "scripts", "feeds")
+sys.path.insert(0, ROOT_DIR)
+
+from newsrss.services.feed_parser import (  # noqa: E402
+    ENGINE_FAST,
+    ENGINE_FEEDPARSER,
+    UnsupportedFeedError,
+    _parse_fast,
+    parse_feed,
+)
+from newsrss.services.rss import RSSService  # noqa: E402
+
+FETCH_TIMEOUT = 30
+
+
+def load_sources(sources: list[str], configured: bool) -> list[tuple[str, bytes]]:
+    """Return the name and the content of every feed to check."""
+    sources = list(sources)
+    if configured:
+        from newsrss.core.config import AppConfig
+
+        sources += [str(feed.url) for feed in AppConfig().get_rss_feeds()]
+    elif not sources:
+        sources = [FIXTURES_DIR]
+
+    documents = []
+    for source in sources:
+        if source.startswith(("http://", "https://")):
+            with urllib.request.urlopen(source, timeout=FETCH_TIMEOUT) as r:
+                documents.append((source, r.read()))
+        elif os.path.isdir(source):
+            for name in sorted(os.listdir(source)):
+                if name.endswith(".xml"):
+                    with open(os.path.join(source, name), "rb") as f:
+                        documents.append((name, f.read()))
+        else:
+            with open(source, "rb") as f:
+                documents.append((source, f.read()))
+    return documents
+
+
+async def extract(content: bytes, engine: str) -> tuple[list[dict], object]:
+    """Return the episodes and the WebSub link extracted by an engine."""
+    parsed = parse_feed(content, engine)
+    episodes = await RSSService()._extract_episodes(parsed, feed_id=0)
+    hub_link = RSSService._discover_hub(parsed.links, "")
+    return [episode.model_dump() for episode in episodes], hub_link
+
+
+def best_time(content: bytes, engine: str, runs: int) -> float:
+    """Return the best parsing time of an engine over several runs."""
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        parse_feed(content, engine)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("sources", nargs="*", help="feed files, directories or URLs")
+    parser.add_argument(
+        "--configured", action="store_true", help="also check the configured feeds"
+    )
+    parser.add_argument("--runs", type=int, default=5, help="timing runs per engine")
+    args = parser.parse_args()
+
+    mismatches = 0
+    for name, content in load_sources(args.sources, args.configured):
+        try:
+            _parse_fast(content)
+            engine_used = ENGINE_FAST
+        except (ET.ParseError, UnsupportedFeedError) as e:
+            engine_used = f"fallback ({e})"
+
+        fast = asyncio.run(extract(content, ENGINE_FAST))
+        reference = asyncio.run(extract(content, ENGINE_FEEDPARSER))
+        status = "OK" if fast == reference else "MISMATCH"
+        mismatches += fast != reference
+
+        fast_time = best_time(content, ENGINE_FAST, args.runs)
+        reference_time = best_time(content, ENGINE_FEEDPARSER, args.runs)
+        print(
+            f"{status:<8} {name}: {len(reference[0])} episodes, "
+            f"fast {fast_time * 1000:.1f}ms vs feedparser "
+            f"{reference_time * 1000:.1f}ms "
+            f"(x{reference_time / fast_time:.1f}) [{engine_used}]"
+        )
+        if fast != reference:
+            for fast_episode, reference_episode in zip(
+                fast[0], reference[0], strict=False
+            ):
+                if fast_episode != reference_episode:
+                    print(f"  fast:       {fast_episode}")
+                    print(f"  feedparser: {reference_episode}")
+                    break
+            if fast[1] != reference[1]:
+                print(f"  hub links: {fast[1]} != {reference[1]}")
+
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,313 @@
+"""
+WebSub check against a local stub hub: serves a feed advertising a stub hub,
+runs the WebSub callback endpoint on a local port and checks the whole
+subscriber flow, without network access:
+
+- subscription request sent to the hub discovered in the feed
+- verification of intent through the callback (challenge echoed)
+- polling slowed down while the subscription is active
+- signed content push applied to the cache, unsigned pushes and bad
+  signatures ignored (the subscriber runs without a configured secret, so
+  the per-subscription one is used)
+- lease expiry, with the fallback to regular polling
+
+Usage:
+    python scripts/websub_stub_hub.py
+"""
+
+import asyncio
+import hashlib
+import hmac
+import logging
+import os
+import secrets
+import socket
+import sys
+import time
+from collections.abc import Callable
+from typing import Any
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+from newsrss.services import websub as websub_module  # noqa: E402
+
+# Lease granted by the hub, and lease requested by the subscriber (the renewal
+# margin is a fraction of the latter)
+HUB_LEASE_SECONDS = 1
+SUBSCRIBER_LEASE_SECONDS = 2
+HTTP_STATUS_OK = 200
+HTTP_STATUS_ACCEPTED = 202
+WAIT_TIMEOUT = 10.0
+POLL_STEP = 0.05
+
+FEED_TEMPLATE = """<?xml version="1.0" encoding="UTF-8"?>
+<rss version="2.0" xmlns:atom="http://www.w3.org/2005/Atom">
+  <channel>
+    <title>Stub feed</title>
+    <atom:link rel="hub" href="{hub}"/>
+    <atom:link rel="self" href="{topic}"/>
+    {items}
+  </channel>
+</rss>
+"""
+ITEM_TEMPLATE = """<item>
+      <title>{title}</title>
+      <guid>{guid}</guid>
+      <pubDate>{published}</pubDate>
+      <enclosure url="http://127.0.0.1/{guid}.mp3" type="audio/mpeg"/>
+    </item>"""
+
+
+def feed_document(hub: str, topic: str, items: list[tuple[str, str, str]]) -> bytes:
+    """Render a feed with the given (title, guid, published) items."""
+    rendered = "".join(
+        ITEM_TEMPLATE.format(title=title, guid=guid, published=published)
+        for title, guid, published in items
+    )
+    return FEED_TEMPLATE.format(hub=hub, topic=topic, items=rendered).encode()
+
+
+def _listening_socket() -> socket.socket:
+    """Return a socket bound to a free local port."""
+    sock = socket.socket()
+    sock.bind(("127.0.0.1", 0))
+    sock.listen()
+    return sock
+
+
+class StubHub:
+    """
+    Minimal WebSub hub that also serves the feed (the publisher side).
+
+    Subscription requests are accepted and verified asynchronously, like
+    real hubs do; verification can be turned off to let a lease lapse.
+    """
+
+    def __init__(self) -> None:
+        self.sock = _listening_socket()
+        self.base_url = f"http://127.0.0.1:{self.sock.getsockname()[1]}"
+        self.hub_url = f"{self.base_url}/hub"
+        self.topic = f"{self.base_url}/feed.xml"
+        self.feed = feed_document(
+            self.hub_url, self.topic, [("First", "ep-1", "2026-01-01T08:00:00Z")]
+        )
+        self.verify_requests = True
+        self.feed_requests = 0
+        self.subscribe_requests = 0
+        self.verified: list[dict[str, str]] = []
+        self.subscriber: dict[str, str] = {}
+        self._tasks: set[asyncio.Task[Any]] = set()
+
+    async def start(self) -> Any:
+        from aiohttp import web
+
+        app = web.Application()
+        app.router.add_get("/feed.xml", self._serve_feed)
+        app.router.add_post("/hub", self._subscribe)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        await web.SockSite(runner, self.sock).start()
+        return runner
+
+    async def _serve_feed(self, request: Any) -> Any:
+        from aiohttp import web
+
+        self.feed_requests += 1
+        return web.Response(body=self.feed, content_type="application/rss+xml")
+
+    async def _subscribe(self, request: Any) -> Any:
+        from aiohttp import web
+
+        form = await request.post()
+        self.subscribe_requests += 1
+        self.subscriber = {key: str(value) for key, value in form.items()}
+        if self.verify_requests:
+            task = asyncio.create_task(self._verify(dict(self.subscriber)))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+        return web.Response(status=202)
+
+    async def _verify(self, subscriber: dict[str, str]) -> None:
+        """Send the verification of intent to the callback."""
+        import aiohttp
+
+        challenge = secrets.token_hex(8)
+        params = {
+            "hub.mode": subscriber["hub.mode"],
+            "hub.topic": subscriber["hub.topic"],
+            "hub.challenge": challenge,
+            "hub.lease_seconds": str(HUB_LEASE_SECONDS),
+        }
+        async with aiohttp.ClientSession() as session:
+            async with session.get(subscriber["hub.callback"], params=params) as r:
+                if r.status == HTTP_STATUS_OK and await r.text() == challenge:
+                    self.verified.append(subscriber)
+
+    async def push(self, content: bytes, secret: str | None = None) -> int:
+        """Distribute content to the subscriber, signed with its secret."""
+        import aiohttp
+
+        headers = {"Content-Type": "application/rss+xml"}
+        secret = secret if secret is not None else self.subscriber.get("hub.secret")
+        if secret:
+            digest = hmac.new(secret.encode(), content, hashlib.sha256).hexdigest()
+            headers["X-Hub-Signature"] = f"sha256={digest}"
+        async with aiohttp.ClientSession() as session:
+            async with session.post(
+                self.subscriber["hub.callback"], data=content, headers=headers
+            ) as r:
+                return r.status
+
+
+async def wait_for(condition: Callable[[], bool]) -> bool:
+    """Wait until a condition holds, up to WAIT_TIMEOUT seconds."""
+    deadline = time.monotonic() + WAIT_TIMEOUT
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        await asyncio.sleep(POLL_STEP)
+    return condition()
+
+
+async def serve_callback(websub: Any) -> tuple[Any, asyncio.Task[None], str]:
+    """Serve the WebSub callback endpoint of the application on a local port."""
+    import uvicorn
+    from fastapi import FastAPI
+
+    from newsrss.api import websub as websub_api
+    from newsrss.core.dependencies import get_websub
+
+    app = FastAPI()
+    app.include_router(websub_api.router)
+    app.dependency_overrides[get_websub] = lambda: websub
+
+    sock = _listening_socket()
+    server = uvicorn.Server(uvicorn.Config(app, log_level="warning"))
+    task = asyncio.create_task(server.serve(sockets=[sock]))
+    await wait_for(lambda: server.started)
+    return server, task, f"http://127.0.0.1:{sock.getsockname()[1]}"
+
+
+async def run_checks() -> int:
+    from newsrss.models.schemas import RSSFeed
+    from newsrss.services.rss import RSSService
+
+    # Check the leases every few milliseconds instead of every minute
+    websub_module.RENEWAL_CHECK_INTERVAL = POLL_STEP
+
+    hub = StubHub()
+    runner = await hub.start()
+    rss_service = RSSService(timeout=5, max_retries=1)
+    websub = websub_module.WebSubService(
+        rss_service,
+        callback_base_url="http://placeholder",
+        lease_seconds=SUBSCRIBER_LEASE_SECONDS,
+        poll_interval=3600,
+    )
+    server, server_task, callback_base_url = await serve_callback(websub)
+    websub.callback_base_url = callback_base_url
+    rss_service.add_refresh_listener(websub.on_refresh)
+    feed = RSSFeed(id=1, name="Stub", url=hub.topic, description="", timeout=5)
+
+    failures = 0
+
+    def check(name: str, passed: bool) -> None:
+        nonlocal failures
+        failures += not passed
+        print(f"{'OK' if passed else 'FAIL':<5} {name}")
+
+    renewals = asyncio.create_task(websub.run())
+    try:
+        # Subscribe: the first poll discovers the hub
+        await rss_service.fetch_feed(feed)
+        check(
+            "subscription sent to the hub advertised by the feed",
+            await wait_for(lambda: hub.subscribe_requests == 1),
+        )
+        check(
+            "subscription requests the topic and a generated secret",
+            hub.subscriber.get("hub.topic") == hub.topic
+            and bool(hub.subscriber.get("hub.secret"))
+            and hub.subscriber.get("hub.secret")
+            == websub.subscriptions[feed.id].secret,
+        )
+
+        # Verification callback
+        check(
+            "verification challenge echoed by the callback",
+            await wait_for(lambda: len(hub.verified) == 1),
+        )
+        subscription = websub.subscriptions[feed.id]
+        check("subscription active after verification", subscription.state == "active")
+        check(
+            "polling slowed down while subscribed",
+            rss_service.poll_intervals.get(feed.id) == websub.poll_interval,
+        )
+        requests = hub.feed_requests
+        await rss_service.fetch_feed(feed)
+        check("fresh feed not polled", hub.feed_requests == requests)
+
+        # Signed push, then an unsigned push and a push with a bad signature
+        pushed = feed_document(
+            hub.hub_url, hub.topic, [("Pushed", "ep-2", "2026-01-02T08:00:00Z")]
+        )
+        status = await hub.push(pushed)
+        check(
+            "signed push applied to the cache",
+            status == HTTP_STATUS_ACCEPTED
+            and rss_service.episodes_cache[feed.id][0].guid == "ep-2",
+        )
+        check(
+            "pushed entries merged with the cached ones",
+            [e.guid for e in rss_service.episodes_cache[feed.id]] == ["ep-2", "ep-1"],
+        )
+        forged = feed_document(
+            hub.hub_url, hub.topic, [("Forged", "ep-3", "2026-01-03T08:00:00Z")]
+        )
+        status = await hub.push(forged, secret="")
+        check(
+            "unsigned push ignored",
+            status == HTTP_STATUS_ACCEPTED
+            and rss_service.episodes_cache[feed.id][0].guid == "ep-2",
+        )
+        status = await hub.push(forged, secret="wrong-secret")
+        check(
+            "push with a bad signature ignored",
+            status == HTTP_STATUS_ACCEPTED
+            and rss_service.episodes_cache[feed.id][0].guid == "ep-2",
+        )
+
+        # Lease expiry: the hub stops verifying renewals
+        hub.verify_requests = False
+        check(
+            "lease renewal requested before expiry",
+            await wait_for(lambda: hub.subscribe_requests > 1),
+        )
+        check(
+            "subscription pending after the lease expired",
+            await wait_for(lambda: subscription.state == "pending"),
+        )
+        check(
+            "fallback to regular polling",
+            feed.id not in rss_service.poll_intervals,
+        )
+        requests = hub.feed_requests
+        await rss_service.fetch_feed(feed)
+        check("feed polled again after expiry", hub.feed_requests == requests + 1)
+    finally:
+        renewals.cancel()
+        server.should_exit = True
+        await server_task
+        await runner.cleanup()
+
+    return 1 if failures else 0
+
+
+def main() -> int:
+    logging.basicConfig(level=logging.WARNING)
+    return asyncio.run(run_checks())
+
+
+if __name__ == "__main__":
+    sys.exit(main())